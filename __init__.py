@@ -8,15 +8,38 @@ bl_info = {
     "category": "Animation"
 }
 
+import time
+_import_start = time.perf_counter()
+
 import bpy
-from operators import *
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import FloatProperty, EnumProperty, PointerProperty, BoolProperty, StringProperty
-from bpy.utils import previews
+from bpy.props import FloatProperty, EnumProperty, PointerProperty, BoolProperty, StringProperty, IntProperty
 import os
+from . import operators
+from .preset_catalog import PresetCatalog
+from .thumbnail_cache import ThumbnailCache
+from . import keyframe_index
+from . import action_gc
+from . import retime
+from .instrumentation import instrumentation
+from .preview_player import preview_player, redraw_sidebar, PREVIEW_MEMORY_BUDGET_MB
+from .preset_watcher import PresetWatcher
+from .batch_apply import assign_shared_action, stagger_offsets, push_preset_strip, scale_preset_strips
+from .deferred_update import DeferredSpeedApplier
+from . import preset_bake
+from .preset_bake import motion_previews
+from .preset_loader import PresetModuleCache
+from .keyframe_presets import (
+    KeyframePresetLibrary, PresetFormatError, build_action, apply_keyframe_preset,
+    shared_action, is_preset_built, PRESET_SOURCE_KEY, PARAMETER_DEFAULTS,
+)
+
+# register() should stay within this budget; heavy work (NumPy, PIL, preset
+# scanning and preview decoding) is deferred until it is first needed
+REGISTER_BUDGET_MS = 20.0
 
-# Global preview collection
-preview_collections = {}
+# Startup timings in milliseconds, filled in at import and register time
+startup_report = {}
 
 def get_addon_name():
     return os.path.basename(os.path.dirname(__file__))
@@ -28,78 +51,76 @@ def get_presets_path():
         os.makedirs(presets_path)
     return presets_path
 
+def get_thumbnail_cache_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES', path=get_addon_name()), "thumbnails")
+
+def get_timing_log_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES', path=get_addon_name()), "timings.jsonl")
+
+# Seconds between writes of buffered timing records
+TIMING_LOG_INTERVAL = 5.0
+
+def flush_timing_log():
+    instrumentation.flush()
+    return TIMING_LOG_INTERVAL if instrumentation.log_path else None
+
+def update_timing_log(self, context):
+    if self.log_timings:
+        log_path = bpy.path.abspath(self.timing_log_path) if self.timing_log_path else get_timing_log_path()
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        instrumentation.log_path = log_path
+        if not bpy.app.timers.is_registered(flush_timing_log):
+            bpy.app.timers.register(flush_timing_log, first_interval=TIMING_LOG_INTERVAL, persistent=True)
+    else:
+        instrumentation.flush()
+        instrumentation.log_path = None
+
+def update_preview_memory(self, context):
+    preview_player.cache.set_budget(self.preview_memory_mb * 1024 * 1024)
+
+# Template preset parameters exposed as param_* properties in the panel
+PANEL_PARAMETERS = ("duration", "amplitude", "axis", "easing", "loops")
+
+def update_parameter_defaults(self, context):
+    if self.override_parameters:
+        self.load_parameter_defaults()
+
+# Cached preset enum items and preview icons, rescanned only on change
+preset_catalog = PresetCatalog(get_presets_path, ThumbnailCache(get_thumbnail_cache_path()))
+preview_player.source_resolver = preset_catalog.source_path
+
+def get_bake_path(identifier):
+    path = os.path.join(get_presets_path(), identifier.lower() + preset_bake.BAKE_SUFFIX)
+    return path if os.path.exists(path) else None
+
+motion_previews.bake_resolver = get_bake_path
+
+def on_presets_changed(diff):
+    if preset_catalog.apply_diff(diff):
+        redraw_sidebar()
+
+# Picks up added, changed and removed previews without a restart
+preset_watcher = PresetWatcher(get_presets_path, on_presets_changed)
+
 def get_preset_items(self, context):
-    enum_items = []
-    
     if context is None:
-        return enum_items
-    
-    pcoll = preview_collections.get("main")
-    if not pcoll:
-        pcoll = previews.new()
-        preview_collections["main"] = pcoll
-    
-    # Clear existing previews
-    pcoll.clear()
-    
-    # Load previews from presets directory
-    presets_path = get_presets_path()
-    index = 1
-    
-    if os.path.exists(presets_path):
-        for filename in sorted(os.listdir(presets_path)):
-            if filename.lower().endswith((".gif", ".png", ".jpg")):
-                filepath = os.path.join(presets_path, filename)
-                
-                try:
-                    thumb = pcoll.load(filename, filepath, 'IMAGE')
-                    enum_items.append((
-                        os.path.splitext(filename)[0].upper(),
-                        os.path.splitext(filename)[0].replace('_', ' ').title(),
-                        f"Apply {filename} animation preset",
-                        thumb.icon_id,
-                        index
-                    ))
-                    index += 1
-                except Exception as e:
-                    print(f"Error loading preview for {filename}: {e}")
-    
-    return enum_items
-
-# Function to apply popup rotation animation
-def apply_popup_rotation(obj):
-    # Create new animation data if it doesn't exist
-    if not obj.animation_data:
-        obj.animation_data_create()
-    
-    # Create a new action if it doesn't exist
-    action = bpy.data.actions.new(name="PopupRotation")
-    obj.animation_data.action = action
-    
-    # Create rotation keyframes
-    rot_fcurves = []
-    for i in range(3):  # X, Y, Z rotation
-        fc = action.fcurves.new(data_path="rotation_euler", index=i)
-        rot_fcurves.append(fc)
-    
-    # Set keyframes for popup rotation
-    frame_start = 1
-    frame_end = 24
-    
-    # Initial position
-    for i, fc in enumerate(rot_fcurves):
-        kf = fc.keyframe_points.insert(frame_start, 0)
-        kf.interpolation = 'BOUNCE'
-    
-    # Rotation
-    rot_fcurves[2].keyframe_points.insert(frame_end, 6.28319)  # 360 degrees in radians
-    
-    # Set nice easing
-    for fc in rot_fcurves:
-        for kf in fc.keyframe_points:
-            kf.easing = 'EASE_OUT'
-            kf.handle_left_type = 'AUTO_CLAMPED'
-            kf.handle_right_type = 'AUTO_CLAMPED'
+        return []
+    
+    with instrumentation.timer("get_preset_items"):
+        return preset_catalog.get_items()
+
+# Imported preset scripts, reloaded only when the file changes
+preset_modules = PresetModuleCache()
+
+# Parsed declarative keyframe presets, preloaded after registration
+keyframe_presets = KeyframePresetLibrary(get_presets_path)
+
+def preload_keyframe_presets():
+    start = time.perf_counter()
+    keyframe_presets.preload()
+    startup_report["preset_preload"] = (time.perf_counter() - start) * 1000
 
 class AnimationPresetProperties(PropertyGroup):
     animation_speed: FloatProperty(
@@ -114,39 +135,282 @@ class AnimationPresetProperties(PropertyGroup):
     preset_enum: EnumProperty(
         items=get_preset_items,
         name="Presets",
-        description="Animation presets"
+        description="Animation presets",
+        update=lambda self, context: update_parameter_defaults(self, context)
+    )
+    
+    batch_mode: BoolProperty(
+        name="Batch",
+        description="Build the preset action once and share it across all selected objects",
+        default=False
+    )
+    
+    batch_frame_offset: FloatProperty(
+        name="Offset",
+        description="Stagger step in frames (per object, per unit of distance, or maximum random offset); strip starts are rounded to whole frames",
+        default=0.0,
+        min=0.0
+    )
+    
+    stagger_mode: EnumProperty(
+        items=[
+            ('INDEX', "Index", "Offset each object by a fixed step in selection order"),
+            ('DISTANCE', "Distance", "Offset by distance from the 3D cursor"),
+            ('RANDOM', "Random", "Seeded random offset up to the step"),
+        ],
+        name="Stagger",
+        description="How per-object start offsets are computed in batch mode",
+        default='INDEX'
+    )
+    
+    stagger_seed: IntProperty(
+        name="Seed",
+        description="Seed for random offsets and amplitude jitter",
+        default=0,
+        min=0
+    )
+    
+    stagger_jitter: FloatProperty(
+        name="Jitter",
+        description="Random reduction of each object's amplitude (strip influence)",
+        default=0.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    
+    # Panel preview playback, driven by preview_player
+    current_frame: IntProperty(
+        name="Frame",
+        description="Current frame of the preset preview",
+        default=0,
+        min=0
+    )
+    
+    total_frames: IntProperty(
+        name="Frames",
+        description="Number of frames in the preset preview",
+        default=0,
+        min=0
     )
+    
+    is_playing: BoolProperty(
+        name="Playing",
+        description="Whether the preset preview is playing",
+        default=False
+    )
+    
+    # Overrides for parametric (template) keyframe presets
+    override_parameters: BoolProperty(
+        name="Customize",
+        description="Override the parameters of template-based presets",
+        default=False,
+        update=lambda self, context: update_parameter_defaults(self, context)
+    )
+    
+    param_duration: FloatProperty(
+        name="Duration",
+        description="Frames per loop",
+        default=24.0,
+        min=1.0
+    )
+    
+    param_amplitude: FloatProperty(
+        name="Amplitude",
+        description="Value reached at the end of the curve template",
+        default=1.0
+    )
+    
+    param_axis: EnumProperty(
+        items=[('X', "X", ""), ('Y', "Y", ""), ('Z', "Z", "")],
+        name="Axis",
+        description="Channel the curve is applied to",
+        default='Z'
+    )
+    
+    param_easing: EnumProperty(
+        items=[
+            ('CONSTANT', "Constant", ""),
+            ('LINEAR', "Linear", ""),
+            ('BEZIER', "Bezier", ""),
+            ('SINE', "Sine", ""),
+            ('QUAD', "Quadratic", ""),
+            ('CUBIC', "Cubic", ""),
+            ('QUART', "Quartic", ""),
+            ('QUINT', "Quintic", ""),
+            ('EXPO', "Exponential", ""),
+            ('CIRC', "Circular", ""),
+            ('BACK', "Back", ""),
+            ('BOUNCE', "Bounce", ""),
+            ('ELASTIC', "Elastic", ""),
+        ],
+        name="Easing",
+        description="Interpolation between the template keys",
+        default='BEZIER'
+    )
+    
+    param_loops: IntProperty(
+        name="Loops",
+        description="Number of times the curve template repeats",
+        default=1,
+        min=1,
+        max=100
+    )
+    
+    # NLA layering
+    apply_mode: EnumProperty(
+        items=[
+            ('LAYER', "Layer", "Push the preset as an NLA strip referencing one shared action"),
+            ('ACTION', "Replace", "Replace the object's action with a new copy of the preset"),
+        ],
+        name="Apply",
+        description="How presets are added to objects",
+        default='LAYER'
+    )
+    
+    layer_blend: EnumProperty(
+        items=[
+            ('REPLACE', "Replace", ""),
+            ('COMBINE', "Combine", ""),
+            ('ADD', "Add", ""),
+            ('SUBTRACT', "Subtract", ""),
+            ('MULTIPLY', "Multiply", ""),
+        ],
+        name="Blend",
+        description="How the preset strip blends with the layers below it",
+        default='REPLACE'
+    )
+    
+    layer_influence: FloatProperty(
+        name="Influence",
+        description="Influence of the preset strip",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    
+    layer_start: IntProperty(
+        name="Start",
+        description="Frame the preset strip starts at",
+        default=1
+    )
+    
+    layer_repeat: FloatProperty(
+        name="Repeat",
+        description="Number of times the preset strip repeats",
+        default=1.0,
+        min=0.1,
+        max=1000.0
+    )
+    
+    # Performance instrumentation
+    show_performance: BoolProperty(
+        name="Performance",
+        description="Show timings of the addon's operations",
+        default=False
+    )
+    
+    log_timings: BoolProperty(
+        name="Log Timings",
+        description="Append every timing as a JSON line to the timing log",
+        default=False,
+        update=lambda self, context: update_timing_log(self, context)
+    )
+    
+    timing_log_path: StringProperty(
+        name="Log File",
+        description="Timing log file (defaults to timings.jsonl in the addon's user data folder)",
+        default="",
+        subtype='FILE_PATH',
+        update=lambda self, context: update_timing_log(self, context)
+    )
+    
+    preview_memory_mb: IntProperty(
+        name="Preview Memory",
+        description="Memory kept for decoded preview animations; the least recently shown are freed past it",
+        default=PREVIEW_MEMORY_BUDGET_MB,
+        min=8,
+        max=4096,
+        update=lambda self, context: update_preview_memory(self, context)
+    )
+    
+    auto_clean_actions: BoolProperty(
+        name="Auto Clean",
+        description="Merge identical actions and purge unused ones every time the file is saved",
+        default=False
+    )
+    
+    def layer_settings(self):
+        if self.apply_mode != 'LAYER':
+            return None
+        return {
+            "start": self.layer_start,
+            "blend_type": self.layer_blend,
+            "influence": self.layer_influence,
+            "repeat": self.layer_repeat,
+            "scale": self.animation_speed / 1000.0,
+        }
+    
+    def parameter_overrides(self):
+        if not self.override_parameters:
+            return {}
+        return {name: getattr(self, "param_" + name) for name in PANEL_PARAMETERS}
+    
+    def load_parameter_defaults(self):
+        """
+        Fill the param_* properties with the selected template preset's own
+        parameters, so Customize starts from the preset rather than from the
+        panel defaults
+        """
+        try:
+            preset = keyframe_presets.get(self.preset_enum)
+        except PresetFormatError:
+            return
+        parameters = getattr(preset, "parameters", None)
+        if parameters is None:
+            return
+        parameters = dict(PARAMETER_DEFAULTS, **parameters)
+        for name in PANEL_PARAMETERS:
+            setattr(self, "param_" + name, parameters[name])
+
+def apply_animation_speed(view_layer, animation_speed, final=True):
+    speed = animation_speed / 1000.0  # Convert to reasonable range
+    
+    # Objects in batch mode share one action, so retime each action once
+    actions = {
+        obj.animation_data.action
+        for obj in view_layer.objects.selected
+        if obj.animation_data and obj.animation_data.action
+    }
+    
+    # Layered and staggered presets are retimed through their strip scale
+    frame_range = scale_preset_strips(view_layer.objects.selected, is_preset_built, speed)
+    for action in actions:
+        action_range = retime.retime_action(action, speed)
+        if action_range is None:
+            continue
+        if frame_range is None:
+            frame_range = action_range
+        else:
+            frame_range = (min(frame_range[0], action_range[0]), max(frame_range[1], action_range[1]))
+    
+    keyframe_index.scene_keyframes.invalidate()
+    
+    # Only touch the scene frame range once the slider is released
+    if final and frame_range:
+        scene = view_layer.id_data
+        scene.frame_start = int(frame_range[0])
+        scene.frame_end = int(frame_range[1])
+
+# Slider changes are queued and applied from a timer at a bounded rate
+speed_applier = DeferredSpeedApplier(apply_animation_speed)
 
 def update_animation_timing(self, context):
     if not context.selected_objects:
         return
-        
-    for obj in context.selected_objects:
-        if obj.animation_data and obj.animation_data.action:
-            speed = self.animation_speed / 1000.0  # Convert to reasonable range
-            action = obj.animation_data.action
-            
-            # Store original keyframe times if not already stored
-            if not hasattr(action, "original_keyframes"):
-                action.original_keyframes = {}
-                for fc in action.fcurves:
-                    action.original_keyframes[fc.data_path] = [
-                        (kf.co.x, kf.handle_left.x, kf.handle_right.x)
-                        for kf in fc.keyframe_points
-                    ]
-            
-            # Update keyframes based on speed
-            for fc in action.fcurves:
-                if fc.data_path in action.original_keyframes:
-                    for kf, orig in zip(fc.keyframe_points, action.original_keyframes[fc.data_path]):
-                        kf.co.x = orig[0] * speed
-                        kf.handle_left.x = orig[1] * speed
-                        kf.handle_right.x = orig[2] * speed
-            
-            # Update scene frame range
-            if action.frame_range:
-                context.scene.frame_start = int(action.frame_range[0] * speed)
-                context.scene.frame_end = int(action.frame_range[1] * speed)
+    
+    speed_applier.request(context, self.animation_speed)
 
 class ANIM_OT_play_animation(Operator):
     bl_idname = "anim.play_animation"
@@ -169,26 +433,25 @@ class ANIM_OT_reset_animation(Operator):
         context.scene.frame_current = context.scene.frame_start
         return {'FINISHED'}
 
+# Neighbouring presets on each side whose previews are decoded ahead of time
+PREFETCH_RADIUS = 2
+
+def step_preset(context, step):
+    props = context.scene.animation_preset_props
+    identifier = preset_catalog.neighbour(props.preset_enum, step)
+    if identifier is None:
+        return
+    if identifier != props.preset_enum:
+        props.preset_enum = identifier
+    preview_player.prefetch([identifier] + preset_catalog.neighbours(identifier, PREFETCH_RADIUS))
+
 class ANIM_OT_previous_preset(Operator):
     bl_idname = "anim.previous_preset"
     bl_label = "Previous Preset"
     bl_description = "Go to previous animation preset"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        items = props.preset_enum
-        current_idx = 0
-        
-        # Find current index
-        for i, (identifier, name, _, _, _) in enumerate(items):
-            if identifier == props.preset_enum:
-                current_idx = i
-                break
-        
-        # Set to previous item
-        if current_idx > 0:
-            props.preset_enum = items[current_idx - 1][0]
-        
+        step_preset(context, -1)
         return {'FINISHED'}
 
 class ANIM_OT_next_preset(Operator):
@@ -197,20 +460,7 @@ class ANIM_OT_next_preset(Operator):
     bl_description = "Go to next animation preset"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        items = props.preset_enum
-        current_idx = 0
-        
-        # Find current index
-        for i, (identifier, name, _, _, _) in enumerate(items):
-            if identifier == props.preset_enum:
-                current_idx = i
-                break
-        
-        # Set to next item
-        if current_idx < len(items) - 1:
-            props.preset_enum = items[current_idx + 1][0]
-        
+        step_preset(context, 1)
         return {'FINISHED'}
 
 class ANIM_OT_add_preset(Operator):
@@ -224,31 +474,124 @@ class ANIM_OT_add_preset(Operator):
         return context.selected_objects and context.scene.animation_preset_props.preset_enum != 'NONE'
     
     def execute(self, context):
+        with instrumentation.timer("add_preset"):
+            return self.apply_preset(context)
+    
+    def apply_preset(self, context):
         props = context.scene.animation_preset_props
         preset = props.preset_enum
         
         if not context.selected_objects:
             self.report({'WARNING'}, "No objects selected")
             return {'CANCELLED'}
-            
-        for obj in context.selected_objects:
-            if preset == "POPUP_ROTATION":
-                apply_popup_rotation(obj)
-                self.report({'INFO'}, f"Applied popup rotation animation to {obj.name}")
+        
+        try:
+            keyframe_preset = keyframe_presets.get(preset)
+            if keyframe_preset is not None:
+                keyframe_preset = keyframe_preset.instantiate(**props.parameter_overrides())
+        except PresetFormatError as e:
+            self.report({'ERROR'}, f"Invalid keyframe preset {str(e)}")
+            return {'CANCELLED'}
+        
+        if keyframe_preset is None:
+            return self.execute_script(context, preset, props.batch_mode)
+        
+        if props.batch_mode:
+            return self.execute_batch(context, preset, keyframe_preset)
+        
+        layer = props.layer_settings()
+        if layer is not None:
+            action = shared_action(keyframe_preset)
+            for obj in context.selected_objects:
+                push_preset_strip(obj, action, **layer)
+        else:
+            for obj in context.selected_objects:
+                apply_keyframe_preset(obj, keyframe_preset)
+        self.report({'INFO'}, f"Applied {keyframe_preset.name} animation to {len(context.selected_objects)} objects")
+        
+        return {'FINISHED'}
+    
+    def stagger(self, context, objects):
+        props = context.scene.animation_preset_props
+        return stagger_offsets(
+            objects,
+            props.stagger_mode,
+            props.batch_frame_offset,
+            origin=context.scene.cursor.location,
+            seed=props.stagger_seed,
+            jitter=props.stagger_jitter,
+        )
+    
+    def execute_script(self, context, preset, batch_mode):
+        preset_path = os.path.join(get_presets_path(), f"{preset.lower()}.py")
+        if not os.path.exists(preset_path):
+            self.report({'WARNING'}, f"Preset file not found: {preset.lower()}.py")
+            return {'CANCELLED'}
+        
+        try:
+            module, load_time = preset_modules.load(preset_path)
+        except Exception as e:
+            self.report({'ERROR'}, f"Error loading preset: {str(e)}")
+            return {'CANCELLED'}
+        
+        create_animation = getattr(module, "create_animation", None)
+        if create_animation is None:
+            self.report({'ERROR'}, f"Preset {preset.lower()}.py has no create_animation(obj) function")
+            return {'CANCELLED'}
+        
+        objects = context.selected_objects
+        # Only actions the script created may be tagged as preset-built
+        actions_before = [obj.animation_data.action if obj.animation_data else None for obj in objects]
+        start = time.perf_counter()
+        try:
+            if batch_mode:
+                # Run the script once and share the resulting action
+                create_animation(objects[0])
+                anim = objects[0].animation_data
+                if anim and anim.action:
+                    action = anim.action
+                    # Set again by assign_shared_action unless strips replace it,
+                    # so the first object isn't retimed twice
+                    anim.action = None
+                    if action != actions_before[0]:
+                        action[PRESET_SOURCE_KEY] = preset
+                    layer = context.scene.animation_preset_props.layer_settings()
+                    assign_shared_action(
+                        objects, action, *self.stagger(context, objects),
+                        layer=layer, replace=is_preset_built if layer is None else None
+                    )
             else:
-                # Handle other presets here
-                preset_path = os.path.join(get_presets_path(), f"{preset.lower()}.py")
-                if os.path.exists(preset_path):
-                    try:
-                        exec(compile(open(preset_path).read(), preset_path, 'exec'))
-                        self.report({'INFO'}, f"Applied {preset} animation")
-                    except Exception as e:
-                        self.report({'ERROR'}, f"Error applying preset: {str(e)}")
-                        return {'CANCELLED'}
-                else:
-                    self.report({'WARNING'}, f"Preset file not found: {preset.lower()}.py")
-                    return {'CANCELLED'}
+                for obj in objects:
+                    create_animation(obj)
+        except Exception as e:
+            self.report({'ERROR'}, f"Error applying preset: {str(e)}")
+            return {'CANCELLED'}
+        apply_time = time.perf_counter() - start
+
+        # Mark the script's actions as preset-built, so Clean Up Actions may merge them
+        for obj, action_before in zip(objects, actions_before):
+            anim = obj.animation_data
+            if anim and anim.action and anim.action != action_before and anim.action.library is None:
+                anim.action[PRESET_SOURCE_KEY] = preset
         
+        self.report({'INFO'}, f"Applied {preset} animation to {len(objects)} objects "
+                              f"(load {load_time * 1000:.1f} ms, apply {apply_time * 1000:.1f} ms)")
+        return {'FINISHED'}
+    
+    def execute_batch(self, context, preset, keyframe_preset):
+        objects = context.selected_objects
+        start = time.perf_counter()
+        
+        layer = context.scene.animation_preset_props.layer_settings()
+        action = shared_action(keyframe_preset) if layer is not None else build_action(keyframe_preset)
+        assign_shared_action(
+            objects, action, *self.stagger(context, objects),
+            layer=layer, replace=is_preset_built if layer is None else None
+        )
+        
+        elapsed = time.perf_counter() - start
+        per_1k = elapsed / len(objects) * 1000
+        self.report({'INFO'}, f"Applied {preset} to {len(objects)} objects in {elapsed:.3f}s ({per_1k:.3f}s per 1k objects)")
         return {'FINISHED'}
 
 class ANIM_PT_main_panel(Panel):
@@ -293,11 +636,62 @@ class ANIM_PT_main_panel(Panel):
         col.scale_y = 8.0  # Match preview height
         col.operator("anim.next_preset", text="", icon='TRIA_RIGHT')
         
+        # Preview playback
+        icon_id = preview_player.icon_id(props.preset_enum, props.current_frame)
+        if icon_id is not None:
+            box.template_icon(icon_value=icon_id, scale=8.0)
+        
+        # Motion curves from the preset's bake, if there is one
+        icon_id = motion_previews.icon_id(props.preset_enum)
+        if icon_id is not None:
+            box.template_icon(icon_value=icon_id, scale=4.0)
+        
+        row = box.row(align=True)
+        row.operator("anim.skip_to_start", text="", icon='REW')
+        row.operator("anim.previous_frame", text="", icon='FRAME_PREV')
+        row.operator("anim.preview_play", text="", icon='PAUSE' if props.is_playing else 'PLAY')
+        row.operator("anim.next_frame", text="", icon='FRAME_NEXT')
+        row.operator("anim.skip_to_end", text="", icon='FF')
+        row.operator("anim.preview_reset", text="", icon='LOOP_BACK')
+        
         # Add animation button
         row = box.row()
         row.scale_y = 1.5
         row.operator("anim.add_preset", text="Add Animation")
         
+        # NLA layering
+        box.row().prop(props, "apply_mode", expand=True)
+        if props.apply_mode == 'LAYER':
+            col = box.column(align=True)
+            col.prop(props, "layer_blend")
+            col.prop(props, "layer_influence", slider=True)
+            row = col.row(align=True)
+            row.prop(props, "layer_start")
+            row.prop(props, "layer_repeat")
+        
+        row = box.row(align=True)
+        row.prop(props, "batch_mode", toggle=True)
+        sub = row.row(align=True)
+        sub.active = props.batch_mode
+        sub.prop(props, "batch_frame_offset")
+        if props.batch_mode:
+            col = box.column(align=True)
+            col.prop(props, "stagger_mode")
+            row = col.row(align=True)
+            row.prop(props, "stagger_seed")
+            row.prop(props, "stagger_jitter", slider=True)
+        
+        # Template preset parameters
+        box.prop(props, "override_parameters")
+        if props.override_parameters:
+            col = box.column(align=True)
+            col.prop(props, "param_duration")
+            col.prop(props, "param_amplitude")
+            col.prop(props, "param_loops")
+            row = box.row(align=True)
+            row.prop(props, "param_axis", expand=True)
+            box.prop(props, "param_easing")
+        
         # Tools Section
         box = layout.box()
         box.label(text="")
@@ -309,7 +703,7 @@ class ANIM_PT_main_panel(Panel):
         # Left timeline controls
         subrow = row.row(align=True)
         subrow.operator("screen.frame_jump", text="", icon='REW').end = False
-        subrow.operator("screen.keyframe_jump", text="", icon='PREV_KEYFRAME').next = False
+        subrow.operator("anim.previous_keyframe", text="", icon='PREV_KEYFRAME')
         
         # Play controls
         subrow = row.row(align=True)
@@ -318,12 +712,55 @@ class ANIM_PT_main_panel(Panel):
         
         # Right timeline controls
         subrow = row.row(align=True)
-        subrow.operator("screen.keyframe_jump", text="", icon='NEXT_KEYFRAME').next = True
+        subrow.operator("anim.next_keyframe", text="", icon='NEXT_KEYFRAME')
         subrow.operator("screen.frame_jump", text="", icon='FF').end = True
         
         # Speed Control
         row = box.row(align=True)
         row.prop(props, "animation_speed", text="Speed")
+        
+        # Action cleanup
+        row = box.row(align=True)
+        row.operator("anim.clean_preset_actions", icon='TRASH')
+        row.operator("anim.bake_presets", icon='EXPORT')
+        row.prop(props, "auto_clean_actions", text="", icon='FILE_REFRESH')
+        
+        # Performance
+        box = layout.box()
+        box.prop(props, "show_performance", icon='TRIA_DOWN' if props.show_performance else 'TRIA_RIGHT', emboss=False)
+        if props.show_performance:
+            summaries = instrumentation.summaries()
+            if not summaries:
+                box.label(text="No timings recorded yet")
+            else:
+                col = box.column(align=True)
+                row = col.row()
+                for heading in ("", "Count", "p50", "p95", "Max"):
+                    row.label(text=heading)
+                for stats in summaries:
+                    row = col.row()
+                    row.label(text=stats["name"])
+                    row.label(text=str(stats["count"]))
+                    row.label(text=f"{stats['p50_ms']:.1f} ms")
+                    row.label(text=f"{stats['p95_ms']:.1f} ms")
+                    row.label(text=f"{stats['max_ms']:.1f} ms")
+            
+            applier = speed_applier.stats()
+            box.label(text=f"Speed updates: {applier['requested']} requested, {applier['applied']} applied, "
+                           f"{applier['coalesced']} coalesced")
+            
+            used, prefetched, count = preview_player.memory_usage()
+            row = box.row(align=True)
+            row.label(text=f"Preview memory: {used / 1048576:.1f} / {props.preview_memory_mb} MB "
+                           f"({count} previews, {prefetched / 1048576:.1f} MB prefetched)")
+            row.prop(props, "preview_memory_mb", text="")
+            
+            row = box.row(align=True)
+            row.prop(props, "log_timings")
+            sub = row.row(align=True)
+            sub.active = props.log_timings
+            sub.prop(props, "timing_log_path", text="")
+            box.operator("anim.reset_performance_stats", icon='X')
 
 classes = (
     ANIM_OT_previous_preset,
@@ -332,24 +769,80 @@ classes = (
     ANIM_OT_play_animation,
     ANIM_OT_reset_animation,
     ANIM_OT_add_preset,
+    operators.ANIM_OT_previous_keyframe,
+    operators.ANIM_OT_next_keyframe,
+    operators.ANIM_OT_preview_play,
+    operators.ANIM_OT_next_frame,
+    operators.ANIM_OT_previous_frame,
+    operators.ANIM_OT_skip_to_start,
+    operators.ANIM_OT_skip_to_end,
+    operators.ANIM_OT_decrease_frame,
+    operators.ANIM_OT_increase_frame,
+    operators.ANIM_OT_preview_reset,
+    operators.ANIM_OT_clean_actions,
+    operators.ANIM_OT_reset_performance_stats,
+    operators.ANIM_OT_bake_presets,
     ANIM_PT_main_panel,
 )
 
+def format_startup_report():
+    lines = ["Animation Presets Pro startup:"]
+    for phase, ms in startup_report.items():
+        lines.append(f"  {phase:<16} {ms:8.2f} ms")
+    return "\n".join(lines)
+
 def register():
+    start = time.perf_counter()
+    
     for cls in classes:
         bpy.utils.register_class(cls)
     
     bpy.types.Scene.animation_preset_props = PointerProperty(type=AnimationPresetProperties)
+    startup_report["classes"] = (time.perf_counter() - start) * 1000
+    
+    keyframe_index.register()
+    action_gc.register()
+    retime.register()
+    
+    # Background jobs never show the panel; presets are loaded on first use.
+    # In the UI, parse keyframe presets once startup has finished.
+    if not bpy.app.background:
+        bpy.app.timers.register(preload_keyframe_presets, first_interval=1.0)
+        preset_catalog.poll_signatures = False
+        preset_watcher.start()
+    
+    startup_report["register"] = (time.perf_counter() - start) * 1000
+    if startup_report["register"] > REGISTER_BUDGET_MS:
+        print(f"Animation Presets Pro: register() took {startup_report['register']:.1f} ms "
+              f"(budget {REGISTER_BUDGET_MS:.0f} ms)")
+    if bpy.app.debug_python:
+        print(format_startup_report())
 
 def unregister():
-    for pcoll in preview_collections.values():
-        previews.remove(pcoll)
-    preview_collections.clear()
+    if bpy.app.timers.is_registered(flush_timing_log):
+        bpy.app.timers.unregister(flush_timing_log)
+    instrumentation.flush()
+    instrumentation.log_path = None
+    if bpy.app.timers.is_registered(preload_keyframe_presets):
+        bpy.app.timers.unregister(preload_keyframe_presets)
+    preset_watcher.stop()
+    preset_catalog.poll_signatures = True
+    keyframe_index.unregister()
+    action_gc.unregister()
+    retime.unregister()
+    preview_player.close()
+    motion_previews.close()
+    speed_applier.cancel()
+    preset_modules.clear()
+    keyframe_presets.clear()
+    preset_catalog.close()
     
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     
     del bpy.types.Scene.animation_preset_props
 
+startup_report["import"] = (time.perf_counter() - _import_start) * 1000
+
 if __name__ == "__main__":
     register()
\ No newline at end of file
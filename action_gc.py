@@ -0,0 +1,143 @@
+import hashlib
+from collections import namedtuple
+import bpy
+from bpy.app.handlers import persistent
+from .keyframe_presets import PRESET_KEY, is_preset_built
+
+# Rough in-memory/on-disk sizes used to estimate what a cleanup saved:
+# a BezTriple, an FCurve without its keyframes, and an action ID block
+KEYFRAME_BYTES = 72
+FCURVE_BYTES = 160
+ACTION_BYTES = 1024
+
+# Keyframe attributes read with foreach_get when fingerprinting
+FLOAT_ATTRS = ("co", "handle_left", "handle_right")
+
+# Enum attributes (foreach_get only handles numbers) read per keyframe
+ENUM_ATTRS = ("interpolation", "easing", "handle_left_type", "handle_right_type")
+
+CleanupReport = namedtuple("CleanupReport", ("merged", "purged", "bytes_saved"))
+
+
+def estimate_action_bytes(action):
+    fcurves = action.fcurves
+    keyframes = sum(len(fc.keyframe_points) for fc in fcurves)
+    return ACTION_BYTES + len(fcurves) * FCURVE_BYTES + keyframes * KEYFRAME_BYTES
+
+
+def action_fingerprint(action):
+    """
+    Hash of everything that affects how action evaluates, or None if it has
+    data that isn't hashed (F-curve modifiers) and must not be merged
+    """
+    import numpy as np
+
+    digest = hashlib.sha1(action.id_root.encode())
+    # Manual frame range (Blender 3.1+)
+    if getattr(action, "use_frame_range", False):
+        digest.update(f"range:{action.frame_start}:{action.frame_end}:{action.use_cyclic}".encode())
+    for fc in sorted(action.fcurves, key=lambda fc: (fc.data_path, fc.array_index)):
+        if len(fc.modifiers):
+            return None
+        points = fc.keyframe_points
+        count = len(points)
+        group = fc.group.name if fc.group else ""
+        digest.update(f"{fc.data_path}[{fc.array_index}]{fc.extrapolation}:{fc.mute}:{group}:{count}".encode())
+
+        buf = np.empty(count * 2, dtype=np.float32)
+        for attr in FLOAT_ATTRS:
+            points.foreach_get(attr, buf)
+            digest.update(buf.tobytes())
+        for attr in ENUM_ATTRS:
+            digest.update(",".join(getattr(kf, attr) for kf in points).encode())
+    return digest.hexdigest()
+
+
+def _keeper_order(action):
+    # Prefer shared preset actions, then protected ones, then the plainest name
+    return (
+        PRESET_KEY not in action,
+        not action.use_fake_user,
+        -action.users,
+        len(action.name),
+        action.name,
+    )
+
+
+def merge_duplicate_actions(actions=None):
+    """
+    Remap every user of a preset-built action onto one datablock with
+    identical content and remove the duplicates. The user's own actions are
+    never merged. Returns (count, bytes) removed.
+    """
+    if actions is None:
+        actions = bpy.data.actions
+    groups = {}
+    for action in actions:
+        if action.library is not None or not is_preset_built(action):
+            continue
+        key = action_fingerprint(action)
+        if key is not None:
+            groups.setdefault(key, []).append(action)
+
+    merged = 0
+    bytes_saved = 0
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group.sort(key=_keeper_order)
+        keeper = group[0]
+        for duplicate in group[1:]:
+            bytes_saved += estimate_action_bytes(duplicate)
+            duplicate.user_remap(keeper)
+            bpy.data.actions.remove(duplicate)
+            merged += 1
+    return merged, bytes_saved
+
+
+def purge_unused_actions():
+    """
+    Remove local actions without users or a fake user. Returns (count, bytes).
+    """
+    unused = [
+        action for action in bpy.data.actions
+        if action.users == 0 and not action.use_fake_user and action.library is None
+    ]
+    bytes_saved = sum(estimate_action_bytes(action) for action in unused)
+    for action in unused:
+        bpy.data.actions.remove(action)
+    return len(unused), bytes_saved
+
+
+def clean_actions():
+    """
+    Purge unused actions, then merge identical preset actions
+    """
+    # Purge first so orphans aren't hashed or chosen as merge targets
+    purged, purged_bytes = purge_unused_actions()
+    merged, merged_bytes = merge_duplicate_actions()
+    return CleanupReport(merged, purged, purged_bytes + merged_bytes)
+
+
+def format_report(report):
+    return (f"Merged {report.merged} and purged {report.purged} actions, "
+            f"saved ~{report.bytes_saved / 1024:.1f} KB")
+
+
+@persistent
+def _on_save_pre(*args):
+    props = getattr(bpy.context.scene, "animation_preset_props", None)
+    if props is None or not props.auto_clean_actions:
+        return
+    report = clean_actions()
+    if report.merged or report.purged:
+        print(f"Animation Presets Pro: {format_report(report)}")
+
+
+def register():
+    bpy.app.handlers.save_pre.append(_on_save_pre)
+
+
+def unregister():
+    if _on_save_pre in bpy.app.handlers.save_pre:
+        bpy.app.handlers.save_pre.remove(_on_save_pre)
@@ -0,0 +1,156 @@
+import bpy
+
+def object_locations(objects):
+    """
+    World-space locations of objects as an (n, 3) array, read with a single
+    foreach_get over bpy.data.objects instead of one matrix per object
+    """
+    import numpy as np
+
+    all_objects = bpy.data.objects
+    matrices = np.empty(len(all_objects) * 16, dtype=np.float32)
+    all_objects.foreach_get("matrix_world", matrices)
+    # RNA matrices are flattened column-major, so translation is 12..14
+    translations = matrices.reshape(-1, 16)[:, 12:15]
+
+    index = {obj: i for i, obj in enumerate(all_objects)}
+    return translations[[index[obj] for obj in objects]]
+
+
+def stagger_offsets(objects, mode, step, origin=(0.0, 0.0, 0.0), seed=0, jitter=0.0):
+    """
+    Per-object start offsets in frames and influences, computed in one pass.
+
+    INDEX offsets each object by step frames after the previous one,
+    DISTANCE by step frames per unit of distance from origin, and RANDOM
+    by a seeded random amount between 0 and step frames. jitter (0..1)
+    lowers each object's influence by a seeded random amount, which scales
+    the amplitude of the preset.
+    """
+    import numpy as np
+
+    count = len(objects)
+    rng = np.random.default_rng(seed)
+
+    if mode == 'INDEX':
+        offsets = np.arange(count, dtype=np.float64) * step
+    elif mode == 'DISTANCE':
+        distances = np.linalg.norm(object_locations(objects) - np.asarray(origin, dtype=np.float32), axis=1)
+        offsets = distances * step
+    elif mode == 'RANDOM':
+        offsets = rng.uniform(0.0, step, count)
+    else:
+        offsets = np.zeros(count)
+
+    influences = None
+    if jitter > 0.0:
+        influences = 1.0 - rng.uniform(0.0, jitter, count)
+    return offsets, influences
+
+
+def find_preset_strip(anim, action):
+    """
+    Return the (track, strip) a previous push of action created, or (None, None)
+    """
+    track = anim.nla_tracks.get(action.name)
+    if track is not None:
+        for strip in track.strips:
+            if strip.action == action:
+                return track, strip
+    return None, None
+
+
+def push_preset_strip(obj, action, start=None, blend_type='REPLACE', influence=1.0, repeat=1.0, scale=1.0):
+    """
+    Layer action on obj as an NLA strip on its own track, leaving the
+    active action and other tracks alone. Pushing the same action again
+    replaces its strip instead of stacking another one.
+    """
+    anim = obj.animation_data or obj.animation_data_create()
+    if start is None:
+        start = action.frame_range[0]
+
+    track, strip = find_preset_strip(anim, action)
+    if track is None:
+        track = anim.nla_tracks.new()
+        track.name = action.name
+    elif strip is not None:
+        track.strips.remove(strip)
+
+    strip = track.strips.new(action.name, int(round(start)), action)
+    strip.blend_type = blend_type
+    strip.scale = scale
+    strip.repeat = repeat
+    if influence < 1.0:
+        # Enabling animated influence keys the current value, so set it first
+        strip.influence = influence
+        strip.use_animated_influence = True
+    return strip
+
+
+def remove_preset_tracks(anim, is_preset_action):
+    """
+    Remove the NLA tracks whose strips all play preset actions
+    """
+    for track in list(anim.nla_tracks):
+        strips = list(track.strips)
+        if strips and all(strip.action is not None and is_preset_action(strip.action) for strip in strips):
+            anim.nla_tracks.remove(track)
+
+
+def assign_shared_action(objects, action, offsets=None, influences=None, layer=None, replace=None):
+    """
+    Point every object at the same action. With offsets, influences or
+    layer settings (push_preset_strip keywords) each object gets an NLA
+    strip referencing the shared action instead of a copy of it, so memory
+    doesn't grow with objects times keyframes.
+
+    replace is a predicate for preset actions (Replace mode): strips then
+    take the place of the active action and of earlier preset tracks
+    instead of being layered under them.
+    """
+    staggered = offsets is not None and any(offsets)
+    layer = dict(layer or {})
+    start = layer.pop("start", None)
+    if start is None:
+        start = action.frame_range[0]
+    influence = layer.pop("influence", 1.0)
+
+    for i, obj in enumerate(objects):
+        if not staggered and influences is None and not layer:
+            anim = obj.animation_data or obj.animation_data_create()
+            anim.action = action
+            continue
+
+        if replace is not None and obj.animation_data is not None:
+            obj.animation_data.action = None
+            remove_preset_tracks(obj.animation_data, replace)
+        push_preset_strip(
+            obj, action,
+            start=start + float(offsets[i]) if staggered else start,
+            influence=influence * float(influences[i]) if influences is not None else influence,
+            **layer
+        )
+
+
+def scale_preset_strips(objects, is_preset_action, scale):
+    """
+    Retime layered and staggered presets by setting the scale of their
+    strips instead of rewriting keyframes. Returns the (start, end) range of the scaled
+    strips, or None.
+    """
+    frame_range = None
+    for obj in objects:
+        anim = obj.animation_data
+        if anim is None:
+            continue
+        for track in anim.nla_tracks:
+            for strip in track.strips:
+                if strip.action is None or not is_preset_action(strip.action):
+                    continue
+                strip.scale = scale
+                if frame_range is None:
+                    frame_range = (strip.frame_start, strip.frame_end)
+                else:
+                    frame_range = (min(frame_range[0], strip.frame_start), max(frame_range[1], strip.frame_end))
+    return frame_range
@@ -0,0 +1,330 @@
+"""
+Apply presets to objects in many .blend files from the command line.
+
+    blender -b --factory-startup --python batch_apply_files.py -- MANIFEST [options]
+
+Options:
+    --jobs N           number of background Blender processes (default: CPUs - 1)
+    --output DIR       save results into DIR instead of overwriting the files
+    --restart          ignore recorded progress and process every file again
+
+The manifest is a JSON file:
+
+    {
+        "presets": "presets",
+        "tasks": [
+            {
+                "files": ["shots/sh0*.blend"],
+                "objects": ["Crowd_*"],
+                "collections": ["Extras"],
+                "preset": "popup_rotation",
+                "parameters": {"loops": 2},
+                "layer": {"start": 10, "blend_type": "ADD"},
+                "stagger": {"mode": "DISTANCE", "step": 1.5, "seed": 3}
+            }
+        ]
+    }
+
+Paths are relative to the manifest. "files" are glob patterns, and objects
+are selected by fnmatch patterns on their names or on the names of
+collections containing them. "preset" names a .json or .py preset in the
+presets folder; "parameters", "layer" (NLA strip settings, otherwise the
+preset action is shared as the active action) and "stagger" are optional.
+A .py preset runs once per object unless "layer" or "stagger" is given,
+in which case it runs once and its action is shared; "parameters" are
+rejected for .py presets, failing the file.
+
+Every file is processed by its own background Blender process, applying all
+tasks that match it. Progress is recorded next to the manifest, so an
+interrupted run resumes with the files that are not done yet; failures are
+appended to a log and retried on the next run.
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
+if ADDON_DIR not in sys.path:
+    sys.path.insert(0, ADDON_DIR)
+
+from batch_previews import load_json, write_json, load_preset_module
+
+STATE_SUFFIX = ".state.json"
+FAILURE_LOG_SUFFIX = ".failures.log"
+
+# Workers report their timings on a line starting with this marker
+RESULT_MARKER = "APT_BATCH_RESULT "
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="batch_apply_files.py")
+    parser.add_argument("manifest", nargs="?")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--output")
+    parser.add_argument("--restart", action="store_true")
+    # Internal: apply the tasks in TASKS (JSON) to the open file and save it to OUTPUT
+    parser.add_argument("--worker", nargs=2, metavar=("TASKS", "OUTPUT"))
+    return parser.parse_args(argv)
+
+
+def select_objects(object_patterns, collection_patterns):
+    selected = {}
+    for obj in bpy.data.objects:
+        if any(fnmatch.fnmatchcase(obj.name, pattern) for pattern in object_patterns):
+            selected[obj.name] = obj
+    for collection in bpy.data.collections:
+        if any(fnmatch.fnmatchcase(collection.name, pattern) for pattern in collection_patterns):
+            for obj in collection.all_objects:
+                selected[obj.name] = obj
+    # Sorted, so INDEX stagger and seeds are stable between runs
+    return [selected[name] for name in sorted(selected)]
+
+
+def task_stagger(task, objects):
+    from batch_apply import stagger_offsets
+
+    stagger = task.get("stagger")
+    if not stagger:
+        return None, None
+    return stagger_offsets(
+        objects,
+        stagger.get("mode", 'INDEX'),
+        stagger.get("step", 1.0),
+        origin=bpy.context.scene.cursor.location,
+        seed=stagger.get("seed", 0),
+        jitter=stagger.get("jitter", 0.0),
+    )
+
+
+def apply_script_task(task, preset_path, objects):
+    from keyframe_presets import PRESET_SOURCE_KEY, is_preset_built
+    from batch_apply import assign_shared_action
+
+    if task.get("parameters"):
+        raise ValueError(f"{task['preset']}: \"parameters\" only apply to .json presets")
+    create_animation = load_preset_module(preset_path).create_animation
+    name = os.path.splitext(os.path.basename(preset_path))[0].upper()
+
+    layer = task.get("layer")
+    if layer is None and not task.get("stagger"):
+        for obj in objects:
+            action_before = obj.animation_data.action if obj.animation_data else None
+            create_animation(obj)
+            anim = obj.animation_data
+            if anim and anim.action and anim.action != action_before:
+                anim.action[PRESET_SOURCE_KEY] = name
+        return
+
+    # Run the script once and share its action, as batch mode does in the panel
+    action_before = objects[0].animation_data.action if objects[0].animation_data else None
+    create_animation(objects[0])
+    anim = objects[0].animation_data
+    if not anim or not anim.action:
+        raise ValueError(f"{task['preset']}: create_animation(obj) did not assign an action")
+    action = anim.action
+    if action != action_before:
+        action[PRESET_SOURCE_KEY] = name
+    # Set again by assign_shared_action unless strips replace it
+    anim.action = None
+    assign_shared_action(
+        objects, action, *task_stagger(task, objects),
+        layer=layer, replace=is_preset_built if layer is None else None
+    )
+
+
+def apply_task(task, presets_path):
+    from keyframe_presets import load_preset_file, build_action, shared_action, is_preset_built
+    from batch_apply import assign_shared_action
+
+    objects = select_objects(task.get("objects", []), task.get("collections", []))
+    if not objects:
+        return 0
+
+    preset_path = os.path.join(presets_path, task["preset"])
+    if not os.path.splitext(preset_path)[1]:
+        json_path = preset_path + ".json"
+        preset_path = json_path if os.path.exists(json_path) else preset_path + ".py"
+
+    if preset_path.endswith(".py"):
+        apply_script_task(task, preset_path, objects)
+        return len(objects)
+
+    preset = load_preset_file(preset_path).instantiate(**task.get("parameters", {}))
+    layer = task.get("layer")
+    action = shared_action(preset) if layer is not None else build_action(preset)
+    assign_shared_action(
+        objects, action, *task_stagger(task, objects),
+        layer=layer, replace=is_preset_built if layer is None else None
+    )
+    return len(objects)
+
+
+def run_worker(tasks_path, output_path):
+    job = load_json(tasks_path, None)
+    result = {"objects": 0}
+
+    start = time.perf_counter()
+    for task in job["tasks"]:
+        result["objects"] += apply_task(task, job["presets"])
+    result["apply_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    bpy.ops.wm.save_as_mainfile(filepath=output_path, copy=True)
+    result["save_seconds"] = round(time.perf_counter() - start, 3)
+    print(RESULT_MARKER + json.dumps(result))
+
+
+def process_file(blend_path, tasks, presets_path, output_path):
+    with tempfile.NamedTemporaryFile('w', suffix=".json", delete=False) as f:
+        json.dump({"tasks": tasks, "presets": presets_path}, f)
+        tasks_path = f.name
+
+    command = [
+        bpy.app.binary_path, "-b", blend_path, "--python-exit-code", "1",
+        "--python", os.path.realpath(__file__), "--",
+        "--worker", tasks_path, output_path,
+    ]
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    finally:
+        os.remove(tasks_path)
+    elapsed = time.perf_counter() - start
+
+    report = None
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            report = json.loads(line[len(RESULT_MARKER):])
+    if result.returncode != 0 or report is None or not os.path.exists(output_path):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return elapsed, None, result.stdout[-4000:] or f"exit code {result.returncode}"
+    return elapsed, report, None
+
+
+def partial_path(output_path):
+    # Blender only writes files with a .blend extension
+    return os.path.splitext(output_path)[0] + ".partial.blend"
+
+
+def expand_manifest(manifest, manifest_dir):
+    """
+    Return {blend path: [tasks]} for every file matched by the manifest.
+    A task is listed once per file, however many of its patterns match it.
+    """
+    files = {}
+    for task in manifest.get("tasks", []):
+        matched = set()
+        for pattern in task.get("files", []):
+            for path in glob.glob(os.path.join(manifest_dir, pattern)):
+                # Left behind by an interrupted run
+                if not path.endswith(".partial.blend"):
+                    matched.add(os.path.realpath(path))
+        for path in sorted(matched):
+            files.setdefault(path, []).append(task)
+    return files
+
+
+def run_coordinator(args):
+    manifest_path = os.path.realpath(args.manifest)
+    manifest_dir = os.path.dirname(manifest_path)
+    manifest = load_json(manifest_path, None)
+    if manifest is None:
+        sys.exit(f"Can't read manifest {manifest_path}")
+
+    presets_path = os.path.join(manifest_dir, manifest.get("presets", os.path.join(ADDON_DIR, "presets")))
+    state_path = manifest_path + STATE_SUFFIX
+    state = {} if args.restart else load_json(state_path, {})
+    output_dir = os.path.realpath(args.output) if args.output else None
+
+    jobs = []
+    skipped = []
+    for blend_path, tasks in expand_manifest(manifest, manifest_dir).items():
+        output_path = blend_path
+        if output_dir:
+            # Keep the layout below the manifest, so shots can't collide
+            output_path = os.path.join(output_dir, os.path.relpath(blend_path, manifest_dir))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        signature = json.dumps(tasks, sort_keys=True)
+        entry = state.get(blend_path, {})
+        # Done only if the same tasks were applied and the result is untouched
+        done = (
+            entry.get("status") == "done"
+            and entry.get("tasks") == signature
+            and os.path.exists(output_path)
+            and entry.get("mtime") == os.stat(output_path).st_mtime_ns
+        )
+        if done:
+            skipped.append(blend_path)
+        else:
+            jobs.append((blend_path, tasks, output_path, signature))
+
+    print(f"Processing {len(jobs)} files ({len(skipped)} already done) with {args.jobs} jobs")
+
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        # Results are saved to a partial file and moved into place, so an
+        # interrupted save never corrupts a shot
+        futures = [
+            (job, pool.submit(process_file, job[0], job[1], presets_path, partial_path(job[2])))
+            for job in jobs
+        ]
+        for (blend_path, tasks, output_path, signature), future in futures:
+            try:
+                elapsed, report, error = future.result()
+            except Exception:
+                elapsed, report, error = 0.0, None, traceback.format_exc()
+
+            name = os.path.relpath(blend_path, manifest_dir)
+            if error is None:
+                os.replace(partial_path(output_path), output_path)
+                state[blend_path] = {
+                    "status": "done",
+                    "tasks": signature,
+                    "mtime": os.stat(output_path).st_mtime_ns,
+                    "seconds": round(elapsed, 3),
+                    **report,
+                }
+                print(f"  {name}: {report['objects']} objects, apply {report['apply_seconds']:.2f}s, "
+                      f"save {report['save_seconds']:.2f}s, total {elapsed:.2f}s")
+            else:
+                failures += 1
+                state[blend_path] = {"status": "failed", "tasks": signature, "seconds": round(elapsed, 3)}
+                with open(manifest_path + FAILURE_LOG_SUFFIX, 'a') as log:
+                    log.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} {blend_path}\n{error}\n")
+                print(f"  {name}: FAILED")
+            # Written after every file, so a restart resumes from here
+            write_json(state_path, state)
+
+    total = time.perf_counter() - start
+    print(f"Done in {total:.2f}s: {len(jobs) - failures} processed, {failures} failed, "
+          f"{len(skipped)} skipped")
+    if failures:
+        print(f"Failures are logged in {manifest_path + FAILURE_LOG_SUFFIX}")
+    return failures
+
+
+def main():
+    args = parse_args(sys.argv)
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1])
+    elif args.manifest:
+        sys.exit(1 if run_coordinator(args) else 0)
+    else:
+        sys.exit("Usage: blender -b --python batch_apply_files.py -- MANIFEST [--jobs N] [--output DIR] [--restart]")
+
+
+if __name__ == "__main__":
+    main()
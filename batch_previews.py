@@ -0,0 +1,205 @@
+"""
+Build GIF previews for a whole preset library from the command line.
+
+    blender -b --factory-startup --python batch_previews.py -- [options]
+
+Options:
+    --presets DIR      presets folder (default: the addon's presets/ folder)
+    --jobs N           number of background Blender processes (default: CPUs - 1)
+    --size PX          preview width and height (default: 200)
+    --engine ENGINE    render engine used for previews (default: BLENDER_WORKBENCH)
+    --force            rebuild every preview, even if it is up to date
+
+Each preset (.py script or .json keyframe preset) is applied to a stand-in
+cube in its own background Blender process. Presets whose source and .gif
+match the content hashes recorded in the manifest are skipped. A summary of
+timings is written next to the manifest.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
+MANIFEST_NAME = ".preview_manifest.json"
+SUMMARY_NAME = ".preview_build_summary.json"
+
+# Bumped when the GIF encoding changes, so existing previews are rebuilt
+PREVIEW_FORMAT = 2
+PRESET_EXTENSIONS = (".py", ".json")
+
+
+def file_hash(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_json(filepath, default):
+    try:
+        with open(filepath) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(filepath, data):
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="batch_previews.py")
+    parser.add_argument("--presets", default=os.path.join(ADDON_DIR, "presets"))
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--engine", default='BLENDER_WORKBENCH')
+    parser.add_argument("--force", action="store_true")
+    # Internal: render a single preset inside a worker process
+    parser.add_argument("--worker", nargs=2, metavar=("PRESET", "OUTPUT"))
+    return parser.parse_args(argv)
+
+
+def get_stand_in():
+    obj = bpy.data.objects.get("Cube")
+    if obj is None:
+        bpy.ops.mesh.primitive_cube_add()
+        obj = bpy.context.active_object
+    return obj
+
+
+def load_preset_module(preset_path):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(
+        "apt_preset_" + os.path.splitext(os.path.basename(preset_path))[0], preset_path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_worker(preset_path, output_path, size, engine):
+    if ADDON_DIR not in sys.path:
+        sys.path.insert(0, ADDON_DIR)
+    from preview_generator import AnimationPresetGIFPreview
+    from keyframe_presets import load_preset_file, apply_keyframe_preset
+
+    scene = bpy.context.scene
+    scene.render.engine = engine
+
+    obj = get_stand_in()
+    if preset_path.endswith(".json"):
+        apply_keyframe_preset(obj, load_preset_file(preset_path))
+    else:
+        load_preset_module(preset_path).create_animation(obj)
+
+    if obj.animation_data and obj.animation_data.action:
+        start, end = obj.animation_data.action.frame_range
+    else:
+        start, end = scene.frame_start, scene.frame_end
+
+    AnimationPresetGIFPreview().save_preview(output_path, int(start), int(end), size, size)
+
+
+def build_preview(preset_path, output_path, args):
+    command = [
+        bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+        "--python", os.path.realpath(__file__), "--",
+        "--size", str(args.size), "--engine", args.engine,
+        "--worker", preset_path, output_path,
+    ]
+    start = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+
+    error = None
+    if result.returncode != 0 or not os.path.exists(output_path):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        error = result.stdout[-2000:] or f"exit code {result.returncode}"
+    return elapsed, error
+
+
+def run_coordinator(args):
+    presets_path = os.path.realpath(args.presets)
+    manifest_path = os.path.join(presets_path, MANIFEST_NAME)
+    manifest = load_json(manifest_path, {})
+    settings = f"{args.size}:{args.engine}:{PREVIEW_FORMAT}"
+
+    jobs = []
+    skipped = []
+    for filename in sorted(os.listdir(presets_path)):
+        if filename.startswith(".") or not filename.endswith(PRESET_EXTENSIONS):
+            continue
+        name = os.path.splitext(filename)[0]
+        preset_path = os.path.join(presets_path, filename)
+        gif_path = os.path.join(presets_path, name + ".gif")
+        py_hash = file_hash(preset_path)
+
+        entry = manifest.get(name, {})
+        up_to_date = (
+            not args.force
+            and os.path.exists(gif_path)
+            and entry.get("py") == py_hash
+            and entry.get("settings") == settings
+            and entry.get("gif") == file_hash(gif_path)
+        )
+        if up_to_date:
+            skipped.append(name)
+        else:
+            jobs.append((name, preset_path, gif_path, py_hash))
+
+    print(f"Building {len(jobs)} previews ({len(skipped)} up to date) with {args.jobs} jobs")
+
+    results = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        # Workers write to a partial file so a failed build never leaves a
+        # truncated preview behind
+        futures = [(job, pool.submit(build_preview, job[1], job[2] + ".partial", args)) for job in jobs]
+        for (name, preset_path, gif_path, py_hash), future in futures:
+            elapsed, error = future.result()
+            results.append({"preset": name, "seconds": round(elapsed, 3), "error": error})
+            if error is None:
+                os.replace(gif_path + ".partial", gif_path)
+                manifest[name] = {"py": py_hash, "gif": file_hash(gif_path), "settings": settings}
+                print(f"  {name}: {elapsed:.2f}s")
+            else:
+                print(f"  {name}: FAILED")
+            write_json(manifest_path, manifest)
+
+    summary = {
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "jobs": args.jobs,
+        "built": sum(1 for r in results if r["error"] is None),
+        "failed": sum(1 for r in results if r["error"] is not None),
+        "skipped": skipped,
+        "presets": results,
+    }
+    write_json(os.path.join(presets_path, SUMMARY_NAME), summary)
+    print(f"Done in {summary['total_seconds']:.2f}s: {summary['built']} built, "
+          f"{summary['failed']} failed, {len(skipped)} skipped")
+    return summary
+
+
+def main():
+    args = parse_args(sys.argv)
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.size, args.engine)
+    else:
+        run_coordinator(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Time preset enumeration, preset application, speed retiming, baking and
+GIF encoding under plain Python, using the bpy stand-in in fake_bpy.py.
+
+    python benchmarks/bench_offline.py
+    python benchmarks/bench_offline.py --compare benchmarks/results/<commit>.json
+
+Results are written to benchmarks/results/<commit>.json so runs from
+different commits can be compared. Absolute numbers say nothing about
+Blender itself; only compare runs made on the same machine.
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+ADDON_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+PACKAGE = "animation_presets_pro"
+
+sys.path.insert(0, BENCH_DIR)
+import fake_bpy
+
+PRESET_COUNTS = (10, 100, 1000)
+OBJECT_COUNTS = (10, 100, 1000)
+KEYFRAME_COUNTS = (100, 1000, 10000)
+GIF_SIZES = (64, 128, 256)
+GIF_FRAMES = 12
+
+# Relative slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def import_addon():
+    # Run the real __init__ against the stand-in, without register()
+    fake_bpy.install()
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+
+def addon_module(name):
+    return importlib.import_module(f"{PACKAGE}.{name}")
+
+
+def measure(func, repeat=5, setup=None):
+    """
+    Best-of-repeat wall time of func() in seconds; setup() runs untimed
+    before every call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_objects(count):
+    import numpy as np
+
+    fake_bpy.data.clear()
+    rng = np.random.default_rng(0)
+    return [fake_bpy.data.objects.new(f"Cube.{i:04d}", rng.uniform(-10, 10, 3)) for i in range(count)]
+
+
+def make_action(keyframes, channels=3):
+    import numpy as np
+
+    action = fake_bpy.data.actions.new("Bench")
+    for index in range(channels):
+        fc = action.fcurves.new("rotation_euler", index=index)
+        fc.keyframe_points.add(keyframes)
+        co = np.empty((keyframes, 2), dtype=np.float32)
+        co[:, 0] = np.arange(keyframes)
+        co[:, 1] = np.sin(co[:, 0] * 0.1)
+        for attr in fake_bpy.FLOAT_ATTRS:
+            fc.keyframe_points.foreach_set(attr, co.ravel())
+    return action
+
+
+def make_context(addon, objects):
+    scene = fake_bpy.Scene()
+    scene.animation_preset_props = fake_bpy.make_property_group(addon.AnimationPresetProperties)
+    scene.animation_preset_props.preset_enum = 'POPUP_ROTATION'
+    return types.SimpleNamespace(selected_objects=objects, scene=scene)
+
+
+def bench_enumeration(addon, results):
+    preset_catalog = addon_module("preset_catalog")
+    for count in PRESET_COUNTS:
+        root = tempfile.mkdtemp(prefix="apt_bench_")
+        try:
+            for i in range(count):
+                with open(os.path.join(root, f"preset_{i:04d}.png"), "wb") as f:
+                    f.write(b"\x89PNG")
+
+            catalog = preset_catalog.PresetCatalog(lambda: root)
+            results[f"enumerate/first/{count}"] = measure(catalog.get_items, setup=catalog.close)
+            catalog.get_items()
+            results[f"enumerate/cached/{count}"] = measure(catalog.get_items, repeat=50)
+            catalog.close()
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_application(addon, results):
+    keyframe_presets = addon_module("keyframe_presets")
+    for count in OBJECT_COUNTS:
+        for mode, batch in (('LAYER', False), ('ACTION', False), ('LAYER', True)):
+            def setup():
+                objects = make_objects(count)
+                context = make_context(addon, objects)
+                context.scene.animation_preset_props.apply_mode = mode
+                context.scene.animation_preset_props.batch_mode = batch
+                operator.context = context
+
+            operator = addon.ANIM_OT_add_preset()
+            operator.report = lambda level, message: None
+            name = f"apply/{mode.lower()}{'-batch' if batch else ''}/{count}"
+            results[name] = measure(lambda: operator.execute(operator.context), setup=setup)
+
+    template = {
+        "name": "Bench Spin",
+        "template": {"data_path": "rotation_euler", "curve": "SPIN", "hold_other_axes": True},
+    }
+    preset = keyframe_presets.parse_preset(template, "bench")
+    for loops in (1, 10, 100):
+        results[f"apply/template-build/{loops}"] = measure(
+            lambda: keyframe_presets.build_action(preset.instantiate(loops=loops)),
+            setup=fake_bpy.data.clear,
+        )
+
+
+def bench_retiming(addon, results):
+    retime = addon_module("retime")
+    for keyframes in KEYFRAME_COUNTS:
+        fake_bpy.data.clear()
+        retime.clear_cache()
+        action = make_action(keyframes)
+        retime.retime_action(action, 1.0)
+        speeds = iter([0.5, 1.5] * 100)
+        results[f"retime/action/{keyframes}"] = measure(lambda: retime.retime_action(action, next(speeds)))
+
+    for count in OBJECT_COUNTS:
+        objects = make_objects(count)
+        action = make_action(100)
+        for obj in objects:
+            obj.animation_data_create().action = action
+        view_layer = fake_bpy.ViewLayer(fake_bpy.Scene(), objects)
+        speeds = iter([500.0, 1500.0] * 100)
+        results[f"retime/slider/{count}"] = measure(
+            lambda: addon.apply_animation_speed(view_layer, next(speeds))
+        )
+
+
+def bench_bake(addon, results):
+    preset_bake = addon_module("preset_bake")
+    root = tempfile.mkdtemp(prefix="apt_bench_")
+    try:
+        for keyframes in (24, 240, 2400):
+            fake_bpy.data.clear()
+            action = make_action(keyframes)
+            path = os.path.join(root, f"bench_{keyframes}{preset_bake.BAKE_SUFFIX}")
+            results[f"bake/write/{keyframes}"] = measure(
+                lambda: preset_bake.bake_action(path, action, "bench", 24.0), repeat=3
+            )
+            results[f"bake/curve-preview/{keyframes}"] = measure(
+                lambda: preset_bake.render_curve_preview(preset_bake.load_bake(path)["values"])
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_gif(addon, results):
+    import numpy as np
+
+    preview_generator = addon_module("preview_generator")
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow is not installed; skipping GIF encoding")
+        return
+
+    rng = np.random.default_rng(0)
+    for size in GIF_SIZES:
+        # A static noisy background with a square moving over it, then held
+        background = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+        frames = []
+        for i in range(GIF_FRAMES):
+            pixels = background.copy()
+            y = min(i, GIF_FRAMES // 2) * size // GIF_FRAMES
+            pixels[y:y + size // 4, size // 4:size // 2, :3] = 255
+            frames.append(pixels.ravel())
+
+        def encode():
+            writer = preview_generator.GIFStreamWriter(io.BytesIO(), size, size)
+            for pixels in frames:
+                writer.write_frame(preview_generator._quantize_and_encode(pixels, size, size, 42))
+            writer.close()
+
+        def encode_adaptive():
+            encoder = preview_generator.AdaptiveGIFEncoder(io.BytesIO(), size, size)
+            for pixels in frames:
+                encoder.add(preview_generator.to_display_rgb(pixels, size, size), 42)
+            encoder.close()
+
+        results[f"gif/encode/{size}"] = measure(encode, repeat=3)
+        results[f"gif/adaptive/{size}"] = measure(encode_adaptive, repeat=3)
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ADDON_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['commit']}:")
+    regressions = 0
+    for name, seconds in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        change = seconds / before - 1.0
+        flag = "  <-- slower" if change > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"{name:<32} {before * 1000:>10.3f} {seconds * 1000:>10.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    parser.add_argument("--output", help="Where to save results (default: results/<commit>.json)")
+    args = parser.parse_args()
+
+    addon = import_addon()
+    results = {}
+    for bench in (bench_enumeration, bench_application, bench_retiming, bench_bake, bench_gif):
+        bench(addon, results)
+
+    print(f"{'benchmark':<32} {'ms':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds * 1000:>10.3f}")
+
+    commit = current_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=1)
+    print(f"\nSaved {output}")
+
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
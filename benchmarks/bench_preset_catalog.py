@@ -0,0 +1,113 @@
+"""
+Time preset enum redraws against synthetic preset libraries.
+
+Run inside Blender:
+    blender -b --factory-startup --python benchmarks/bench_preset_catalog.py
+"""
+import importlib
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import types
+import zlib
+
+from bpy.utils import previews
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PACKAGE = "animation_presets_pro"
+
+SIZES = (10, 100, 1000)
+REDRAWS = 200
+
+
+def import_addon_module(name):
+    # Import a submodule without running the addon's register-time __init__
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ADDON_DIR]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
+
+
+def write_png(filepath, width=64, height=64):
+    row = b"\x00" + b"\x80\x40\xc0" * width
+    raw = row * height
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw)))
+        f.write(chunk(b"IEND", b""))
+
+
+def make_library(root, count):
+    for i in range(count):
+        write_png(os.path.join(root, f"preset_{i:04d}.png"))
+
+
+def legacy_get_items(pcoll, presets_path):
+    # The pre-catalog behaviour: clear and reload everything on each redraw
+    pcoll.clear()
+    enum_items = []
+    index = 1
+    for filename in sorted(os.listdir(presets_path)):
+        if filename.lower().endswith((".gif", ".png", ".jpg")):
+            thumb = pcoll.load(filename, os.path.join(presets_path, filename), 'IMAGE')
+            name = os.path.splitext(filename)[0]
+            enum_items.append((name.upper(), name.replace('_', ' ').title(), "", thumb.icon_id, index))
+            index += 1
+    return enum_items
+
+
+def time_redraws(func, redraws):
+    start = time.perf_counter()
+    for _ in range(redraws):
+        func()
+    return (time.perf_counter() - start) / redraws
+
+
+def run():
+    preset_catalog = import_addon_module("preset_catalog")
+
+    print(f"{'presets':>8} {'legacy ms':>10} {'catalog ms':>11} {'first ms':>9} {'touch ms':>9}")
+    for count in SIZES:
+        root = tempfile.mkdtemp(prefix="apt_bench_")
+        try:
+            make_library(root, count)
+
+            pcoll = previews.new()
+            redraws = max(1, REDRAWS // count * 10)
+            legacy = time_redraws(lambda: legacy_get_items(pcoll, root), redraws)
+            previews.remove(pcoll)
+
+            catalog = preset_catalog.PresetCatalog(lambda: root)
+            start = time.perf_counter()
+            catalog.get_items()
+            first = time.perf_counter() - start
+
+            cached = time_redraws(catalog.get_items, REDRAWS)
+
+            # A single added preset should only load one new thumbnail
+            write_png(os.path.join(root, "preset_new.png"))
+            loads_before = catalog.load_count
+            start = time.perf_counter()
+            catalog.get_items()
+            touched = time.perf_counter() - start
+            assert catalog.load_count - loads_before == 1
+
+            catalog.close()
+            print(f"{count:>8} {legacy * 1000:>10.3f} {cached * 1000:>11.4f} "
+                  f"{first * 1000:>9.2f} {touched * 1000:>9.2f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,413 @@
+"""
+A minimal stand-in for the parts of bpy the addon touches, so its modules
+can be imported and timed under plain Python.
+
+Only the behaviour the benchmarks rely on is modelled: actions, F-curves
+and keyframe points with foreach_get/foreach_set, objects with animation
+data and NLA strips, preview collections, timers, handlers and the scene
+frame range. Call install() before importing any addon module.
+"""
+import itertools
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+_icon_ids = itertools.count(1)
+
+# Keyframe attributes stored as (n, 2) float arrays
+FLOAT_ATTRS = ("co", "handle_left", "handle_right")
+ENUM_DEFAULTS = {
+    "interpolation": 'BEZIER',
+    "easing": 'AUTO',
+    "handle_left_type": 'AUTO_CLAMPED',
+    "handle_right_type": 'AUTO_CLAMPED',
+}
+
+
+class IDArray(list):
+    def to_list(self):
+        return list(self)
+
+
+class ID:
+    def __init__(self, name):
+        self.name = name
+        self.use_fake_user = False
+        self.library = None
+        self._props = {}
+
+    @property
+    def name_full(self):
+        return self.name
+
+    def as_pointer(self):
+        return id(self)
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = IDArray(value) if isinstance(value, (list, tuple)) else value
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+
+class Keyframe:
+    __slots__ = ("_points", "_index")
+
+    def __init__(self, points, index):
+        object.__setattr__(self, "_points", points)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, attr):
+        if attr in FLOAT_ATTRS:
+            return self._points._floats[attr][self._index]
+        return self._points._enums[attr][self._index]
+
+    def __setattr__(self, attr, value):
+        if attr in FLOAT_ATTRS:
+            self._points._floats[attr][self._index] = value
+        else:
+            self._points._enums[attr][self._index] = value
+
+
+class KeyframePoints:
+    def __init__(self):
+        self._floats = {attr: np.empty((0, 2), dtype=np.float32) for attr in FLOAT_ATTRS}
+        self._enums = {attr: [] for attr in ENUM_DEFAULTS}
+
+    def __len__(self):
+        return len(self._floats["co"])
+
+    def __iter__(self):
+        return (Keyframe(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index):
+        return Keyframe(self, range(len(self))[index])
+
+    def add(self, count):
+        for attr in FLOAT_ATTRS:
+            self._floats[attr] = np.concatenate((self._floats[attr], np.zeros((count, 2), dtype=np.float32)))
+        for attr, default in ENUM_DEFAULTS.items():
+            self._enums[attr].extend([default] * count)
+
+    def foreach_get(self, attr, buf):
+        buf[:] = self._floats[attr].ravel()
+
+    def foreach_set(self, attr, buf):
+        self._floats[attr][:] = np.asarray(buf, dtype=np.float32).reshape(-1, 2)
+
+
+class FCurve:
+    def __init__(self, data_path, index=0, action_group=""):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = types.SimpleNamespace(name=action_group) if action_group else None
+        self.extrapolation = 'CONSTANT'
+        self.mute = False
+        self.modifiers = []
+        self.keyframe_points = KeyframePoints()
+
+    def evaluate(self, frame):
+        # Linear between keyframes; enough for timing, not for accuracy
+        co = self.keyframe_points._floats["co"]
+        return float(np.interp(frame, co[:, 0], co[:, 1]))
+
+    def update(self):
+        order = np.argsort(self.keyframe_points._floats["co"][:, 0], kind='stable')
+        for attr in FLOAT_ATTRS:
+            self.keyframe_points._floats[attr] = self.keyframe_points._floats[attr][order]
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=""):
+        fc = FCurve(data_path, index, action_group)
+        self.append(fc)
+        return fc
+
+
+class Action(ID):
+    id_root = 'OBJECT'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = FCurves()
+
+    @property
+    def frame_range(self):
+        frames = [fc.keyframe_points._floats["co"][:, 0] for fc in self.fcurves if len(fc.keyframe_points)]
+        if not frames:
+            return (0.0, 0.0)
+        frames = np.concatenate(frames)
+        return (float(frames.min()), float(frames.max()))
+
+    @property
+    def users(self):
+        count = 0
+        for obj in data.objects:
+            anim = obj.animation_data
+            if anim is None:
+                continue
+            count += anim.action is self
+            count += sum(strip.action is self for track in anim.nla_tracks for strip in track.strips)
+        return count
+
+    def user_remap(self, new_id):
+        for obj in data.objects:
+            anim = obj.animation_data
+            if anim is None:
+                continue
+            if anim.action is self:
+                anim.action = new_id
+            for track in anim.nla_tracks:
+                for strip in track.strips:
+                    if strip.action is self:
+                        strip.action = new_id
+
+
+class NlaStrip:
+    def __init__(self, name, start, action):
+        self.name = name
+        self.action = action
+        self.action_frame_start, self.action_frame_end = action.frame_range
+        self.frame_start = float(start)
+        self.blend_type = 'REPLACE'
+        self.influence = 1.0
+        self.use_animated_influence = False
+        self.mute = False
+        self._scale = 1.0
+        self._repeat = 1.0
+        self._update_end()
+
+    def _update_end(self):
+        length = max(self.action_frame_end - self.action_frame_start, 1.0)
+        self.frame_end = self.frame_start + length * self._scale * self._repeat
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self._scale = value
+        self._update_end()
+
+    @property
+    def repeat(self):
+        return self._repeat
+
+    @repeat.setter
+    def repeat(self, value):
+        self._repeat = value
+        self._update_end()
+
+
+class NlaStrips(list):
+    def new(self, name, start, action):
+        strip = NlaStrip(name, start, action)
+        self.append(strip)
+        return strip
+
+
+class NlaTrack:
+    def __init__(self):
+        self.name = "NlaTrack"
+        self.mute = False
+        self.strips = NlaStrips()
+
+
+class NlaTracks(list):
+    def new(self, prev=None):
+        track = NlaTrack()
+        self.append(track)
+        return track
+
+    def get(self, name, default=None):
+        return next((track for track in self if track.name == name), default)
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+        self.nla_tracks = NlaTracks()
+
+
+class Object(ID):
+    def __init__(self, name, location=(0.0, 0.0, 0.0)):
+        super().__init__(name)
+        self.matrix_world = np.identity(4, dtype=np.float32)
+        self.matrix_world[3, :3] = location
+        self.animation_data = None
+
+    def animation_data_create(self):
+        self.animation_data = AnimData()
+        return self.animation_data
+
+
+class Collection(list):
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def new(self, name, *args):
+        item = self._factory(name, *args)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+
+    def get(self, name, default=None):
+        return next((item for item in self if item.name == name), default)
+
+    def foreach_get(self, attr, buf):
+        # Only matrix_world is needed; stored column-major like RNA
+        buf[:] = np.concatenate([getattr(item, attr).ravel() for item in self]) if self else []
+
+
+class BlendData:
+    def __init__(self):
+        self.actions = Collection(Action)
+        self.objects = Collection(Object)
+
+    def clear(self):
+        self.actions.clear()
+        self.objects.clear()
+
+
+class Scene(ID):
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.cursor = types.SimpleNamespace(location=(0.0, 0.0, 0.0))
+
+    def frame_set(self, frame):
+        self.frame_current = frame
+
+
+class ViewLayer:
+    def __init__(self, scene, objects):
+        self.id_data = scene
+        self.objects = types.SimpleNamespace(selected=objects)
+
+
+class ImagePreview:
+    def __init__(self):
+        self.icon_id = next(_icon_ids)
+        self.image_size = (0, 0)
+        self.image_pixels = types.SimpleNamespace(foreach_set=lambda pixels: None)
+
+
+class PreviewCollection(dict):
+    def load(self, name, filepath, filetype, force_reload=False):
+        preview = self[name] = ImagePreview()
+        return preview
+
+    def new(self, name):
+        preview = self[name] = ImagePreview()
+        return preview
+
+    def close(self):
+        self.clear()
+
+
+class Timers:
+    def __init__(self):
+        self._registered = {}
+
+    def register(self, func, first_interval=0.0, persistent=False):
+        self._registered[func] = first_interval
+
+    def unregister(self, func):
+        del self._registered[func]
+
+    def is_registered(self, func):
+        return func in self._registered
+
+
+def _property(kind):
+    def make(**kwargs):
+        return (kind, kwargs)
+    return make
+
+
+data = BlendData()
+
+
+def install():
+    """
+    Register the stand-in as bpy (and its submodules) in sys.modules
+    """
+    if "bpy" in sys.modules:
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    bpy.data = data
+
+    bpy.types = types.ModuleType("bpy.types")
+    for name in ("Operator", "Panel", "PropertyGroup", "Scene", "Object", "Action"):
+        setattr(bpy.types, name, type(name, (), {}))
+
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("FloatProperty", "EnumProperty", "PointerProperty", "BoolProperty",
+                 "StringProperty", "IntProperty", "FloatVectorProperty"):
+        setattr(bpy.props, name, _property(name))
+
+    previews = types.ModuleType("bpy.utils.previews")
+    previews.new = PreviewCollection
+    previews.remove = PreviewCollection.close
+
+    user_dir = tempfile.mkdtemp(prefix="fake_bpy_")
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.previews = previews
+    bpy.utils.user_resource = lambda kind, path="": os.path.join(user_dir, path)
+    bpy.utils.register_class = lambda cls: None
+    bpy.utils.unregister_class = lambda cls: None
+
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = lambda func: func
+    for name in ("depsgraph_update_post", "load_post", "save_pre", "undo_post", "redo_post"):
+        setattr(handlers, name, [])
+
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.handlers = handlers
+    bpy.app.timers = Timers()
+    bpy.app.background = True
+    bpy.app.debug_python = False
+
+    bpy.path = types.SimpleNamespace(abspath=lambda path: path)
+    bpy.context = types.SimpleNamespace(scene=Scene(), window_manager=types.SimpleNamespace(windows=[]))
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.utils": bpy.utils,
+        "bpy.utils.previews": previews,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": handlers,
+    })
+    return bpy
+
+
+def make_property_group(cls):
+    """
+    Instantiate a PropertyGroup subclass with every annotated property set
+    to its default
+    """
+    group = cls()
+    for name, (kind, kwargs) in cls.__annotations__.items():
+        default = kwargs.get("default")
+        if default is None and kind == "EnumProperty" and isinstance(kwargs.get("items"), list):
+            default = kwargs["items"][0][0]
+        setattr(group, name, default)
+    return group
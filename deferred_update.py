@@ -0,0 +1,84 @@
+import time
+import bpy
+from .instrumentation import instrumentation
+
+# Minimum seconds between applies while the slider is being dragged
+APPLY_INTERVAL = 0.1
+
+# Seconds without a new value after which the drag is treated as released
+SETTLE_DELAY = 0.3
+
+
+class DeferredSpeedApplier:
+    """
+    Coalesce animation speed changes and apply them from a bpy.app.timers
+    callback. While values keep arriving the latest one is applied at most
+    every APPLY_INTERVAL; once they stop a final exact apply is made.
+    """
+
+    def __init__(self, apply_func):
+        # apply_func(view_layer, animation_speed, final)
+        self._apply = apply_func
+        self._target = None
+        self._pending = False
+        self._last_request = 0.0
+        self._last_apply = 0.0
+        self._timer = self._tick
+
+        self.requested = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.final_applied = 0
+
+    def request(self, context, speed):
+        if self._pending:
+            self.coalesced += 1
+        self._target = (context.scene.name, context.view_layer.name, speed)
+        self._pending = True
+        self._last_request = time.monotonic()
+        self.requested += 1
+
+        if not bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.register(self._timer, first_interval=0.0)
+
+    def _run(self, final):
+        scene_name, view_layer_name, speed = self._target
+        scene = bpy.data.scenes.get(scene_name)
+        view_layer = scene.view_layers.get(view_layer_name) if scene else None
+        if view_layer is None:
+            return
+
+        with instrumentation.timer("apply_animation_speed"):
+            self._apply(view_layer, speed, final)
+        self._last_apply = time.monotonic()
+
+    def _tick(self):
+        now = time.monotonic()
+
+        if self._pending and now - self._last_apply >= APPLY_INTERVAL:
+            self._pending = False
+            self._run(final=False)
+            self.applied += 1
+
+        if now - self._last_request < SETTLE_DELAY:
+            return APPLY_INTERVAL
+
+        # Released: apply the exact latest value once more, including the
+        # work that is skipped during the drag
+        self._pending = False
+        self._run(final=True)
+        self.final_applied += 1
+        return None
+
+    def stats(self):
+        return {
+            "requested": self.requested,
+            "applied": self.applied,
+            "coalesced": self.coalesced,
+            "final": self.final_applied,
+        }
+
+    def cancel(self):
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+        self._pending = False
@@ -0,0 +1,109 @@
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Samples kept per timer for the percentiles
+WINDOW_SIZE = 256
+
+# Flush buffered log records once this many are pending
+LOG_FLUSH_SIZE = 64
+
+
+class TimingStats:
+    """
+    Call count and a rolling window of durations (seconds) for one code path
+    """
+
+    def __init__(self, name, window=WINDOW_SIZE):
+        self.name = name
+        self.count = 0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.samples.append(seconds)
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "count": self.count,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Instrumentation:
+    """
+    Registry of TimingStats filled by the timer() context manager or the
+    timed() decorator, with an optional JSON-lines log. Log records are buffered and written by
+    flush(), never from inside the timed call.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.log_path = None
+        self._pending = []
+
+    def record(self, name, seconds):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TimingStats(name)
+        stats.add(seconds)
+        if self.log_path:
+            self._pending.append({"name": name, "time": time.time(), "ms": seconds * 1000})
+            if len(self._pending) >= LOG_FLUSH_SIZE:
+                self.flush()
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        # Not for RNA callbacks (enum items, operator methods): Blender checks
+        # their argument count, which a (*args, **kwargs) wrapper hides
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summaries(self):
+        return [self.stats[name].summary() for name in sorted(self.stats)]
+
+    def flush(self):
+        if not self._pending or not self.log_path:
+            self._pending = []
+            return
+        try:
+            with open(self.log_path, 'a') as f:
+                for record in self._pending:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Can't write timing log {self.log_path}: {e}")
+        self._pending = []
+
+    def reset(self):
+        self.stats.clear()
+        self._pending = []
+
+
+instrumentation = Instrumentation()
+timed = instrumentation.timed
@@ -0,0 +1,137 @@
+import math
+import bpy
+from bpy.app.handlers import persistent
+
+# Depsgraph update types that can change which keyframes are indexed:
+# edited actions, NLA/animation data on objects, and selection changes
+INVALIDATING_ID_TYPES = ('ACTION', 'OBJECT', 'SCENE')
+
+
+def _action_frames(action):
+    import numpy as np
+
+    fcurves = action.fcurves
+    counts = [len(fc.keyframe_points) for fc in fcurves]
+    buf = np.empty(sum(counts) * 2, dtype=np.float32)
+    offset = 0
+    for fc, count in zip(fcurves, counts):
+        end = offset + count * 2
+        fc.keyframe_points.foreach_get("co", buf[offset:end])
+        offset = end
+    return buf[0::2]
+
+
+def collect_keyframe_frames(objects):
+    """
+    Return the sorted, de-duplicated (whole) keyframe frames of the actions
+    on objects, including NLA strips mapped into scene time
+    """
+    import numpy as np
+
+    chunks = []
+    action_frames = {}
+
+    def frames_of(action):
+        frames = action_frames.get(action)
+        if frames is None:
+            frames = action_frames[action] = _action_frames(action)
+        return frames
+
+    for obj in objects:
+        anim = obj.animation_data
+        if anim is None:
+            continue
+        if anim.action is not None:
+            chunks.append(frames_of(anim.action))
+        for track in anim.nla_tracks:
+            if track.mute:
+                continue
+            for strip in track.strips:
+                if strip.action is None or strip.mute:
+                    continue
+                chunks.append(_strip_frames(strip, frames_of(strip.action)))
+
+    if not chunks:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.rint(np.concatenate(chunks)).astype(np.int64))
+
+
+def _strip_frames(strip, frames):
+    """
+    Map action frames to the scene frames a strip plays them at, once per
+    repeat, dropping keys outside the strip's action range or past its end
+    """
+    import numpy as np
+
+    start, end = strip.action_frame_start, strip.action_frame_end
+    frames = frames[(frames >= start) & (frames <= end)] - start
+    length = end - start
+    if length > 0 and strip.repeat > 1:
+        repeats = np.arange(math.ceil(strip.repeat)) * length
+        frames = (frames[None, :] + repeats[:, None]).ravel()
+    frames = strip.frame_start + frames * strip.scale
+    return frames[frames <= strip.frame_end + 1e-4]
+
+
+class KeyframeIndex:
+    """
+    Sorted keyframe frames of the selected objects, rebuilt lazily after a
+    depsgraph update touches actions, objects or the selection. Previous
+    and next keyframe lookups are binary searches.
+    """
+
+    def __init__(self):
+        self._frames = None
+        self._selection_count = None
+        self.build_count = 0
+
+    def invalidate(self):
+        self._frames = None
+
+    def frames(self, objects):
+        if self._frames is None or self._selection_count != len(objects):
+            self._frames = collect_keyframe_frames(objects)
+            self._selection_count = len(objects)
+            self.build_count += 1
+        return self._frames
+
+    def next_frame(self, objects, frame):
+        import numpy as np
+
+        frames = self.frames(objects)
+        i = np.searchsorted(frames, frame, side='right')
+        return int(frames[i]) if i < len(frames) else None
+
+    def previous_frame(self, objects, frame):
+        import numpy as np
+
+        frames = self.frames(objects)
+        i = np.searchsorted(frames, frame, side='left') - 1
+        return int(frames[i]) if i >= 0 else None
+
+
+scene_keyframes = KeyframeIndex()
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if any(depsgraph.id_type_updated(id_type) for id_type in INVALIDATING_ID_TYPES):
+        scene_keyframes.invalidate()
+
+
+@persistent
+def _on_load_post(*args):
+    scene_keyframes.invalidate()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister():
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    scene_keyframes.invalidate()
@@ -0,0 +1,477 @@
+"""
+Declarative keyframe presets.
+
+A preset is a JSON file next to its preview, e.g. presets/popup_rotation.json:
+
+    {
+        "name": "Popup Rotation",
+        "action_name": "PopupRotation",
+        "channels": [
+            {
+                "data_path": "rotation_euler",
+                "index": 2,
+                "keyframes": [[1, 0.0], [24, 6.28319]],
+                "interpolation": ["BOUNCE", "BEZIER"],
+                "easing": "EASE_OUT",
+                "handle_type": "AUTO_CLAMPED"
+            }
+        ]
+    }
+
+"interpolation", "easing", "handle_left_type" and "handle_right_type"
+("handle_type" sets both) take either one value for all keyframes or a list
+with one value per keyframe. Presets are validated and parsed into arrays
+once, so applying them runs no Python from the preset.
+
+A parametric preset replaces "channels" with a normalized curve template
+(times and values in 0..1) and default parameters:
+
+    {
+        "name": "Popup Rotation",
+        "template": {"data_path": "rotation_euler", "curve": "SPIN", "hold_other_axes": true},
+        "parameters": {"duration": 23, "amplitude": 6.28319, "axis": "Z", "easing": "BOUNCE"}
+    }
+
+"curve" names one of CURVE_TEMPLATES, or "keys" gives the normalized
+[time, value] pairs inline. Parameters are start, duration, amplitude, base,
+axis, easing, ease and loops; any of them can be overridden per application.
+"""
+import hashlib
+import json
+import os
+import bpy
+
+INTERPOLATIONS = {
+    'CONSTANT', 'LINEAR', 'BEZIER', 'SINE', 'QUAD', 'CUBIC', 'QUART',
+    'QUINT', 'EXPO', 'CIRC', 'BACK', 'BOUNCE', 'ELASTIC',
+}
+EASINGS = {'AUTO', 'EASE_IN', 'EASE_OUT', 'EASE_IN_OUT'}
+HANDLE_TYPES = {'FREE', 'ALIGNED', 'VECTOR', 'AUTO', 'AUTO_CLAMPED'}
+
+# Per-keyframe enum settings: (key in the file, allowed values, default)
+ENUM_SETTINGS = (
+    ("interpolation", INTERPOLATIONS, 'BEZIER'),
+    ("easing", EASINGS, 'AUTO'),
+    ("handle_left_type", HANDLE_TYPES, 'AUTO_CLAMPED'),
+    ("handle_right_type", HANDLE_TYPES, 'AUTO_CLAMPED'),
+)
+
+
+AXES = {'X': 0, 'Y': 1, 'Z': 2}
+
+# Built-in normalized curve templates: [time, value] keys in 0..1.
+# Cumulative curves continue from their end value on every loop.
+CURVE_TEMPLATES = {
+    "SPIN": {"keys": [[0.0, 0.0], [1.0, 1.0]], "cumulative": True},
+    "PULSE": {"keys": [[0.0, 0.0], [0.5, 1.0], [1.0, 0.0]], "cumulative": False},
+    "POP": {"keys": [[0.0, 0.0], [0.6, 1.15], [0.8, 0.95], [1.0, 1.0]], "cumulative": False},
+}
+
+PARAMETER_DEFAULTS = {
+    "start": 1.0,
+    "duration": 24.0,
+    "amplitude": 1.0,
+    "base": 0.0,
+    "axis": 'Z',
+    "easing": 'BEZIER',
+    "ease": 'AUTO',
+    "loops": 1,
+}
+
+
+# ID property marking actions built by shared_action, holding content_key()
+PRESET_KEY = "apt_preset_key"
+
+# ID property marking every action built from a preset, holding its name
+PRESET_SOURCE_KEY = "apt_preset_source"
+
+# content_key -> action name, validated against PRESET_KEY on every lookup.
+# Names, not actions: references don't survive undo
+_shared_actions = {}
+
+
+class PresetFormatError(ValueError):
+    pass
+
+
+class KeyframeChannel:
+    __slots__ = ("data_path", "index", "group", "co", "settings")
+
+    def __init__(self, data_path, index, group, co, settings):
+        self.data_path = data_path
+        self.index = index
+        self.group = group
+        # Flat float32 array of (frame, value) pairs, ready for foreach_set
+        self.co = co
+        # {"interpolation": [...], "easing": [...], ...} one value per keyframe
+        self.settings = settings
+
+    def __len__(self):
+        return len(self.co) // 2
+
+
+class KeyframePreset:
+    def __init__(self, name, action_name, channels):
+        self.name = name
+        self.action_name = action_name
+        self.channels = channels
+
+    def instantiate(self, **overrides):
+        # Fixed keyframes; nothing to parameterize
+        return self
+
+    def content_key(self):
+        """
+        Hash of the keyframe data, identifying actions built from it
+        """
+        digest = hashlib.sha1(self.action_name.encode())
+        for channel in self.channels:
+            digest.update(f"{channel.data_path}[{channel.index}]{channel.group}".encode())
+            digest.update(channel.co.tobytes())
+            digest.update(repr(sorted(channel.settings.items())).encode())
+        return digest.hexdigest()
+
+    @property
+    def frame_range(self):
+        import numpy as np
+
+        frames = np.concatenate([channel.co[0::2] for channel in self.channels])
+        return float(frames.min()), float(frames.max())
+
+
+def validate_parameters(parameters, where="parameters"):
+    """
+    Check parameter values and return them with numbers normalized
+    """
+    unknown = set(parameters) - set(PARAMETER_DEFAULTS)
+    if unknown:
+        raise PresetFormatError(f"{where}: unknown parameters {', '.join(sorted(unknown))}")
+
+    result = dict(parameters)
+    for key in ("start", "duration", "amplitude", "base"):
+        if key in result:
+            if not isinstance(result[key], (int, float)) or isinstance(result[key], bool):
+                raise PresetFormatError(f"{where}: '{key}' must be a number")
+            result[key] = float(result[key])
+    if result.get("duration", 1.0) <= 0:
+        raise PresetFormatError(f"{where}: 'duration' must be positive")
+    if "loops" in result and (not isinstance(result["loops"], int) or result["loops"] < 1):
+        raise PresetFormatError(f"{where}: 'loops' must be an integer of at least 1")
+    if result.get("axis", 'Z') not in AXES:
+        raise PresetFormatError(f"{where}: 'axis' must be one of X, Y, Z")
+    if result.get("easing", 'BEZIER') not in INTERPOLATIONS:
+        raise PresetFormatError(f"{where}: invalid easing {result['easing']!r}")
+    if result.get("ease", 'AUTO') not in EASINGS:
+        raise PresetFormatError(f"{where}: invalid ease {result['ease']!r}")
+    return result
+
+
+class ParametricPreset:
+    """
+    A preset built from a normalized curve template. The template (tiled
+    for each loop count) is precomputed once as a NumPy table, so each
+    application is a single scale-and-offset of that table.
+    """
+
+    def __init__(self, name, action_name, data_path, keys, cumulative, hold_other_axes, parameters):
+        self.name = name
+        self.action_name = action_name
+        self.data_path = data_path
+        # (n, 2) float32 array of normalized [time, value] keys
+        self.keys = keys
+        self.cumulative = cumulative
+        self.hold_other_axes = hold_other_axes
+        self.parameters = parameters
+        self._loop_tables = {}
+
+    def loop_table(self, loops):
+        """
+        Return the template repeated loops times as an (m, 2) array with
+        times in 0..loops. Consecutive loops share their join key.
+        """
+        import numpy as np
+
+        table = self._loop_tables.get(loops)
+        if table is not None:
+            return table
+
+        keys = self.keys
+        join = keys[0, 0] == 0.0 and keys[-1, 0] == 1.0
+        parts = []
+        for k in range(loops):
+            part = keys.copy()
+            part[:, 0] += k
+            if self.cumulative:
+                part[:, 1] += k * (keys[-1, 1] - keys[0, 1])
+            parts.append(part[1:] if k and join else part)
+        table = np.ascontiguousarray(np.vstack(parts), dtype=np.float32)
+        self._loop_tables[loops] = table
+        return table
+
+    def instantiate(self, **overrides):
+        """
+        Return a KeyframePreset for these parameters (the preset defaults,
+        updated with overrides)
+        """
+        import numpy as np
+
+        params = dict(PARAMETER_DEFAULTS)
+        params.update(self.parameters)
+        params.update(validate_parameters(overrides, f"{self.name} parameters"))
+
+        table = self.loop_table(params["loops"])
+        scale = np.array((params["duration"], params["amplitude"]), dtype=np.float32)
+        offset = np.array((params["start"], params["base"]), dtype=np.float32)
+        co = table * scale + offset
+
+        def settings(count):
+            return {
+                "interpolation": [params["easing"]] * count,
+                "easing": [params["ease"]] * count,
+                "handle_left_type": ['AUTO_CLAMPED'] * count,
+                "handle_right_type": ['AUTO_CLAMPED'] * count,
+            }
+
+        axis = AXES[params["axis"]]
+        channels = [KeyframeChannel(self.data_path, axis, "", co.ravel(), settings(len(co)))]
+        if self.hold_other_axes:
+            rest = offset.copy()
+            for index in sorted(set(AXES.values()) - {axis}):
+                channels.append(KeyframeChannel(self.data_path, index, "", rest, settings(1)))
+
+        return KeyframePreset(self.name, self.action_name, channels)
+
+
+def _parse_parametric(data, source):
+    import numpy as np
+
+    template = data["template"]
+    where = f"{source}: template"
+    if not isinstance(template, dict):
+        raise PresetFormatError(f"{where}: expected an object")
+
+    data_path = template.get("data_path")
+    if not isinstance(data_path, str) or not data_path:
+        raise PresetFormatError(f"{where}: 'data_path' must be a non-empty string")
+
+    if "curve" in template:
+        curve = CURVE_TEMPLATES.get(template["curve"])
+        if curve is None:
+            raise PresetFormatError(f"{where}: unknown curve {template['curve']!r}")
+        keys, cumulative = curve["keys"], curve["cumulative"]
+    else:
+        keys, cumulative = template.get("keys"), template.get("cumulative", False)
+
+    try:
+        keys = np.array(keys, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise PresetFormatError(f"{where}: 'keys' must be a list of [time, value] pairs")
+    if keys.ndim != 2 or keys.shape[1] != 2 or not len(keys):
+        raise PresetFormatError(f"{where}: 'keys' must be a list of [time, value] pairs")
+    if np.any(keys[:, 0] < 0) or np.any(keys[:, 0] > 1) or np.any(np.diff(keys[:, 0]) <= 0):
+        raise PresetFormatError(f"{where}: key times must be increasing within 0..1")
+
+    parameters = validate_parameters(data.get("parameters", {}), f"{source}: parameters")
+
+    name = data.get("name", source)
+    action_name = data.get("action_name", name.replace(' ', ''))
+    return ParametricPreset(
+        name, action_name, data_path, keys, bool(cumulative),
+        bool(template.get("hold_other_axes", False)), parameters,
+    )
+
+
+def _enum_values(channel_data, key, allowed, default, count, where):
+    value = channel_data.get(key, default)
+    values = value if isinstance(value, list) else [value] * count
+    if len(values) != count:
+        raise PresetFormatError(f"{where}: '{key}' has {len(values)} values for {count} keyframes")
+    for item in values:
+        if item not in allowed:
+            raise PresetFormatError(f"{where}: invalid {key} {item!r}")
+    return values
+
+
+def parse_preset(data, source="preset"):
+    """
+    Validate decoded JSON data and return a KeyframePreset, or a
+    ParametricPreset if the data has a curve template
+    """
+    import numpy as np
+
+    if not isinstance(data, dict):
+        raise PresetFormatError(f"{source}: expected a JSON object")
+    if "template" in data:
+        return _parse_parametric(data, source)
+
+    channels_data = data.get("channels")
+    if not isinstance(channels_data, list) or not channels_data:
+        raise PresetFormatError(f"{source}: 'channels' must be a non-empty list")
+
+    channels = []
+    for i, channel_data in enumerate(channels_data):
+        where = f"{source}: channel {i}"
+        if not isinstance(channel_data, dict):
+            raise PresetFormatError(f"{where}: expected an object")
+
+        data_path = channel_data.get("data_path")
+        if not isinstance(data_path, str) or not data_path:
+            raise PresetFormatError(f"{where}: 'data_path' must be a non-empty string")
+
+        index = channel_data.get("index", 0)
+        if not isinstance(index, int) or index < 0:
+            raise PresetFormatError(f"{where}: 'index' must be a non-negative integer")
+
+        keyframes = channel_data.get("keyframes")
+        try:
+            co = np.array(keyframes, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise PresetFormatError(f"{where}: 'keyframes' must be a list of [frame, value] pairs")
+        if co.ndim != 2 or co.shape[1] != 2 or not len(co):
+            raise PresetFormatError(f"{where}: 'keyframes' must be a list of [frame, value] pairs")
+        if not np.all(np.isfinite(co)):
+            raise PresetFormatError(f"{where}: keyframes must be finite numbers")
+        if np.any(np.diff(co[:, 0]) <= 0):
+            raise PresetFormatError(f"{where}: keyframe frames must be strictly increasing")
+
+        if "handle_type" in channel_data:
+            channel_data = dict(channel_data)
+            channel_data.setdefault("handle_left_type", channel_data["handle_type"])
+            channel_data.setdefault("handle_right_type", channel_data["handle_type"])
+
+        settings = {
+            key: _enum_values(channel_data, key, allowed, default, len(co), where)
+            for key, allowed, default in ENUM_SETTINGS
+        }
+
+        group = channel_data.get("group", "")
+        channels.append(KeyframeChannel(data_path, index, group, co.ravel(), settings))
+
+    name = data.get("name", source)
+    action_name = data.get("action_name", name.replace(' ', ''))
+    return KeyframePreset(name, action_name, channels)
+
+
+def load_preset_file(filepath):
+    try:
+        with open(filepath) as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise PresetFormatError(f"{os.path.basename(filepath)}: {e}")
+    return parse_preset(data, os.path.basename(filepath))
+
+
+def build_action(preset, name=None):
+    """
+    Build an action for preset with one bulk keyframe_points.add + foreach_set
+    per channel
+    """
+    action = bpy.data.actions.new(name=name or preset.action_name)
+    action[PRESET_SOURCE_KEY] = preset.name
+
+    for channel in preset.channels:
+        fc = action.fcurves.new(data_path=channel.data_path, index=channel.index, action_group=channel.group)
+        points = fc.keyframe_points
+        points.add(len(channel))
+        points.foreach_set("co", channel.co)
+        points.foreach_set("handle_left", channel.co)
+        points.foreach_set("handle_right", channel.co)
+
+        # Enum properties can't go through foreach_set, but this runs once
+        # per action rather than once per object
+        settings = channel.settings
+        for i, kf in enumerate(points):
+            kf.interpolation = settings["interpolation"][i]
+            kf.easing = settings["easing"][i]
+            kf.handle_left_type = settings["handle_left_type"][i]
+            kf.handle_right_type = settings["handle_right_type"][i]
+
+        fc.update()
+
+    return action
+
+
+def is_preset_built(action):
+    """
+    True for actions created by applying a preset, shared or not
+    """
+    return PRESET_KEY in action or PRESET_SOURCE_KEY in action
+
+
+def shared_action(preset):
+    """
+    Return the action built from preset's keyframes, building it only if no
+    action in the file has the same content. Layered presets all reference
+    this one action.
+    """
+    key = preset.content_key()
+    action = bpy.data.actions.get(_shared_actions.get(key, ""))
+    if action is not None and action.get(PRESET_KEY) == key:
+        return action
+
+    action = next((a for a in bpy.data.actions if a.get(PRESET_KEY) == key), None)
+    if action is None:
+        action = build_action(preset)
+        action[PRESET_KEY] = key
+    _shared_actions[key] = action.name
+    return action
+
+
+def apply_keyframe_preset(obj, preset, **parameters):
+    if not obj.animation_data:
+        obj.animation_data_create()
+    action = build_action(preset.instantiate(**parameters))
+    obj.animation_data.action = action
+    return action
+
+
+class KeyframePresetLibrary:
+    """
+    Parsed keyframe presets keyed by enum identifier, reloaded when the
+    JSON file changes on disk
+    """
+
+    def __init__(self, get_path):
+        self._get_path = get_path
+        self._presets = {}
+
+    def _filepath(self, identifier):
+        return os.path.join(self._get_path(), f"{identifier.lower()}.json")
+
+    def preload(self):
+        presets_path = self._get_path()
+        try:
+            filenames = os.listdir(presets_path)
+        except OSError:
+            return
+        for filename in filenames:
+            if filename.lower().endswith(".json") and not filename.startswith("."):
+                identifier = os.path.splitext(filename)[0].upper()
+                try:
+                    self.get(identifier)
+                except PresetFormatError as e:
+                    print(f"Invalid keyframe preset {e}")
+
+    def get(self, identifier):
+        """
+        Return the KeyframePreset for identifier, or None if there is no
+        JSON preset with that name. Raises PresetFormatError if it is invalid.
+        """
+        filepath = self._filepath(identifier)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            self._presets.pop(identifier, None)
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._presets.get(identifier)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        preset = load_preset_file(filepath)
+        self._presets[identifier] = (signature, preset)
+        return preset
+
+    def clear(self):
+        self._presets.clear()
@@ -1,51 +1,47 @@
+import os
+import time
 import bpy
 from bpy.types import Operator
-import os
-import bpy.utils.previews
-
-preview_collections = {}
+from bpy.props import IntProperty, BoolProperty
+from .keyframe_index import scene_keyframes
+from .preview_player import preview_player
+from . import action_gc
+from .instrumentation import instrumentation
+from . import preset_bake
+from .keyframe_presets import build_action
 
-def get_preset_path():
-    return os.path.join(os.path.dirname(__file__), "presets")
-
-def generate_previews():
-    enum_items = []
-    pcoll = preview_collections["main"]
-    
-    preview_dir = get_preset_path()
-    if not os.path.exists(preview_dir):
-        os.makedirs(preview_dir)
-        return enum_items
-    
-    image_paths = []
-    for fn in os.listdir(preview_dir):
-        if fn.lower().endswith(".gif"):
-            image_paths.append(fn)
-    
-    for i, name in enumerate(image_paths):
-        filepath = os.path.join(preview_dir, name)
-        if filepath not in pcoll:
-            thumb = pcoll.load(filepath, filepath, 'IMAGE')
-        else:
-            thumb = pcoll[filepath]
-        
-        enum_items.append((
-            name,
-            name.split('.')[0].replace('_', ' ').title(),
-            "",
-            thumb.icon_id,
-            i
-        ))
-    
-    return enum_items
+def load_preview(context):
+    """
+    Decode the selected preset's preview frames (once) and return the props,
+    or None if the preset has no playable preview
+    """
+    props = context.scene.animation_preset_props
+    # The budget is per scene, so follow whichever scene is playing
+    preview_player.cache.set_budget(props.preview_memory_mb * 1024 * 1024)
+    if not preview_player.load(props.preset_enum):
+        return None
+    props.total_frames = preview_player.frame_count
+    if props.current_frame >= props.total_frames:
+        props.current_frame = 0
+    return props
 
-class ANIM_OT_play_animation(Operator):
-    bl_idname = "anim.play_animation"
-    bl_label = "Play/Pause Animation"
+class ANIM_OT_preview_play(Operator):
+    bl_idname = "anim.preview_play"
+    bl_label = "Play/Pause Preview"
+    bl_description = "Play the preset preview in the panel"
     
     def execute(self, context):
         props = context.scene.animation_preset_props
-        props.is_playing = not props.is_playing
+        if props.is_playing:
+            props.is_playing = False
+            preview_player.stop()
+            return {'FINISHED'}
+        
+        if load_preview(context) is None:
+            self.report({'WARNING'}, "Selected preset has no playable preview")
+            return {'CANCELLED'}
+        props.is_playing = True
+        preview_player.start(context.scene)
         return {'FINISHED'}
 
 class ANIM_OT_next_frame(Operator):
@@ -53,8 +49,8 @@ class ANIM_OT_next_frame(Operator):
     bl_label = "Next Frame"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        if props.current_frame < props.total_frames:
+        props = load_preview(context)
+        if props and props.current_frame < props.total_frames - 1:
             props.current_frame += 1
         return {'FINISHED'}
 
@@ -63,8 +59,8 @@ class ANIM_OT_previous_frame(Operator):
     bl_label = "Previous Frame"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        if props.current_frame > 0:
+        props = load_preview(context)
+        if props and props.current_frame > 0:
             props.current_frame -= 1
         return {'FINISHED'}
 
@@ -73,7 +69,9 @@ class ANIM_OT_skip_to_start(Operator):
     bl_label = "Skip to Start"
     
     def execute(self, context):
-        context.scene.animation_preset_props.current_frame = 0
+        props = load_preview(context)
+        if props:
+            props.current_frame = 0
         return {'FINISHED'}
 
 class ANIM_OT_skip_to_end(Operator):
@@ -81,28 +79,35 @@ class ANIM_OT_skip_to_end(Operator):
     bl_label = "Skip to End"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        props.current_frame = props.total_frames
+        props = load_preview(context)
+        if props:
+            props.current_frame = props.total_frames - 1
         return {'FINISHED'}
 
 class ANIM_OT_previous_keyframe(Operator):
     bl_idname = "anim.previous_keyframe"
     bl_label = "Previous Keyframe"
+    bl_description = "Jump to the previous keyframe of the selected objects"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        # For now, jump 10 frames back
-        props.current_frame = max(0, props.current_frame - 10)
+        scene = context.scene
+        frame = scene_keyframes.previous_frame(context.selected_objects, scene.frame_current)
+        if frame is None:
+            return {'CANCELLED'}
+        scene.frame_set(frame)
         return {'FINISHED'}
 
 class ANIM_OT_next_keyframe(Operator):
     bl_idname = "anim.next_keyframe"
     bl_label = "Next Keyframe"
+    bl_description = "Jump to the next keyframe of the selected objects"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        # For now, jump 10 frames forward
-        props.current_frame = min(props.total_frames, props.current_frame + 10)
+        scene = context.scene
+        frame = scene_keyframes.next_frame(context.selected_objects, scene.frame_current)
+        if frame is None:
+            return {'CANCELLED'}
+        scene.frame_set(frame)
         return {'FINISHED'}
 
 class ANIM_OT_decrease_frame(Operator):
@@ -110,8 +115,8 @@ class ANIM_OT_decrease_frame(Operator):
     bl_label = "Decrease Frame"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        if props.current_frame > 0:
+        props = load_preview(context)
+        if props and props.current_frame > 0:
             props.current_frame -= 1
         return {'FINISHED'}
 
@@ -120,24 +125,138 @@ class ANIM_OT_increase_frame(Operator):
     bl_label = "Increase Frame"
     
     def execute(self, context):
-        props = context.scene.animation_preset_props
-        if props.current_frame < props.total_frames:
+        props = load_preview(context)
+        if props and props.current_frame < props.total_frames - 1:
             props.current_frame += 1
         return {'FINISHED'}
 
-class ANIM_OT_reset_animation(Operator):
-    bl_idname = "anim.reset_animation"
-    bl_label = "Reset Animation"
+class ANIM_OT_preview_reset(Operator):
+    bl_idname = "anim.preview_reset"
+    bl_label = "Reset Preview"
     
     def execute(self, context):
         props = context.scene.animation_preset_props
+        preview_player.stop()
         props.current_frame = 0
         props.is_playing = False
         return {'FINISHED'}
 
+class ANIM_OT_clean_actions(Operator):
+    bl_idname = "anim.clean_preset_actions"
+    bl_label = "Clean Up Actions"
+    bl_description = "Merge identical preset actions onto one datablock and purge unused actions"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        actions_before = len(bpy.data.actions)
+        report = action_gc.clean_actions()
+        if not report.merged and not report.purged:
+            self.report({'INFO'}, f"Nothing to clean up in {actions_before} actions")
+        else:
+            self.report({'INFO'}, action_gc.format_report(report))
+        return {'FINISHED'}
+
+class ANIM_OT_reset_performance_stats(Operator):
+    bl_idname = "anim.reset_performance_stats"
+    bl_label = "Reset Timings"
+    bl_description = "Clear the recorded timings (pending log lines are written first)"
+    
+    def execute(self, context):
+        instrumentation.flush()
+        instrumentation.reset()
+        return {'FINISHED'}
+
+class ANIM_OT_bake_presets(Operator):
+    bl_idname = "anim.bake_presets"
+    bl_label = "Bake Presets"
+    bl_description = "Sample every preset's F-curves into float32 arrays (.bake.npz) next to the preset"
+    
+    samples_per_frame: IntProperty(
+        name="Samples per Frame",
+        default=1,
+        min=1,
+        max=16
+    )
+    
+    force: BoolProperty(
+        name="Force",
+        description="Bake presets even if their bake is up to date",
+        default=False
+    )
+    
+    def execute(self, context):
+        # The preset library lives on the addon package, which imports this module
+        from . import get_presets_path, keyframe_presets
+        
+        presets_path = get_presets_path()
+        fps = context.scene.render.fps / context.scene.render.fps_base
+        baked, skipped, failed = 0, 0, []
+        start = time.perf_counter()
+        
+        for filename in sorted(os.listdir(presets_path)):
+            name, ext = os.path.splitext(filename)
+            if filename.startswith(".") or ext.lower() not in (".json", ".py"):
+                continue
+            preset_path = os.path.join(presets_path, filename)
+            output = preset_bake.bake_path(preset_path)
+            key = preset_bake.source_key(preset_path, f"{self.samples_per_frame}:{fps}")
+            if not self.force and preset_bake.is_bake_current(output, key):
+                skipped += 1
+                continue
+            
+            try:
+                samples = None
+                if ext.lower() == ".json":
+                    # Sampled from the parsed keyframes, without an action
+                    preset = keyframe_presets.get(name.upper()).instantiate()
+                    samples = preset_bake.sample_preset(preset, self.samples_per_frame)
+                if samples is not None:
+                    preset_bake.write_bake(output, *samples, key, fps)
+                else:
+                    self.bake_built(output, preset_path, name.upper(), ext.lower(), key, fps)
+                baked += 1
+            except Exception as e:
+                failed.append(filename)
+                print(f"Error baking {filename}: {e}")
+        
+        elapsed = time.perf_counter() - start
+        if failed:
+            self.report({'WARNING'}, f"Baked {baked} presets, {len(failed)} failed: {', '.join(failed)}")
+        else:
+            self.report({'INFO'}, f"Baked {baked} presets ({skipped} up to date) in {elapsed:.2f}s")
+        return {'FINISHED'}
+    
+    def bake_built(self, output, preset_path, identifier, ext, key, fps):
+        action, obj = self.build(preset_path, identifier, ext)
+        try:
+            preset_bake.bake_action(output, action, key, fps, self.samples_per_frame)
+        finally:
+            if obj is not None:
+                bpy.data.objects.remove(obj)
+            bpy.data.actions.remove(action)
+    
+    def build(self, preset_path, identifier, ext):
+        # Returns the preset's action and the temporary object it was built on
+        from . import keyframe_presets, preset_modules
+        
+        if ext == ".json":
+            return build_action(keyframe_presets.get(identifier).instantiate()), None
+        
+        module, load_time = preset_modules.load(preset_path)
+        obj = bpy.data.objects.new("PresetBake", None)
+        try:
+            module.create_animation(obj)
+            action = obj.animation_data.action if obj.animation_data else None
+            if action is None:
+                raise ValueError("create_animation(obj) did not assign an action")
+        except Exception:
+            bpy.data.objects.remove(obj)
+            raise
+        return action, obj
+
 # Register all operators
 classes = (
-    ANIM_OT_play_animation,
+    ANIM_OT_preview_play,
     ANIM_OT_next_frame,
     ANIM_OT_previous_frame,
     ANIM_OT_skip_to_start,
@@ -146,7 +265,10 @@ classes = (
     ANIM_OT_next_keyframe,
     ANIM_OT_decrease_frame,
     ANIM_OT_increase_frame,
-    ANIM_OT_reset_animation,
+    ANIM_OT_preview_reset,
+    ANIM_OT_clean_actions,
+    ANIM_OT_reset_performance_stats,
+    ANIM_OT_bake_presets,
 )
 
 def register():
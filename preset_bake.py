@@ -0,0 +1,450 @@
+import hashlib
+import os
+import struct
+import zipfile
+
+BAKE_SUFFIX = ".bake.npz"
+CURVE_PREVIEW_SIZE = 128
+
+# Channel colors of the curve preview, cycled (RGBA)
+CURVE_COLORS = (
+    (230, 80, 80, 255),
+    (110, 200, 80, 255),
+    (80, 140, 240, 255),
+    (230, 190, 60, 255),
+)
+
+
+def bake_path(preset_path):
+    return os.path.splitext(preset_path)[0] + BAKE_SUFFIX
+
+
+def source_key(preset_path, extra=""):
+    """
+    Hash of the preset file (and anything else the bake depends on)
+    """
+    digest = hashlib.sha1(extra.encode())
+    with open(preset_path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def sample_action(action, samples_per_frame=1):
+    """
+    Evaluate every F-curve of action over its frame range. Returns
+    (frames, values, channels): a float32 array of sample frames, a float32
+    (channels, samples) array and the "data_path[index]" of each row.
+    """
+    import numpy as np
+
+    start, end = action.frame_range
+    count = int(round((end - start) * samples_per_frame)) + 1
+    frames = np.linspace(start, end, count, dtype=np.float32)
+
+    fcurves = list(action.fcurves)
+    values = np.empty((len(fcurves), count), dtype=np.float32)
+    times = frames.tolist()
+    for row, fc in enumerate(fcurves):
+        # F-curves only evaluate one time per call; keep the loop minimal
+        evaluate = fc.evaluate
+        values[row] = [evaluate(t) for t in times]
+
+    channels = [f"{fc.data_path}[{fc.array_index}]" for fc in fcurves]
+    return frames, values, channels
+
+
+def _ease_in(curve):
+    return lambda t, b, c: b + c * curve(t)
+
+
+def _ease_out(curve):
+    return lambda t, b, c: b + c * (1.0 - curve(1.0 - t))
+
+
+def _ease_in_out(curve):
+    import numpy as np
+    return lambda t, b, c: b + c * np.where(t < 0.5, curve(2.0 * t) / 2.0, 1.0 - curve(2.0 - 2.0 * t) / 2.0)
+
+
+def _bounce_out(t):
+    import numpy as np
+    t = np.asarray(t, dtype=np.float64)
+    return np.select(
+        [t < 1 / 2.75, t < 2 / 2.75, t < 2.5 / 2.75],
+        [7.5625 * t * t,
+         7.5625 * (t - 1.5 / 2.75) ** 2 + 0.75,
+         7.5625 * (t - 2.25 / 2.75) ** 2 + 0.9375],
+        7.5625 * (t - 2.625 / 2.75) ** 2 + 0.984375,
+    )
+
+
+def _easing_curves():
+    import numpy as np
+    # Ease-in shape of each Penner easing on 0..1, as Blender evaluates them
+    return {
+        'SINE': lambda t: 1.0 - np.cos(t * np.pi / 2),
+        'QUAD': lambda t: t ** 2,
+        'CUBIC': lambda t: t ** 3,
+        'QUART': lambda t: t ** 4,
+        'QUINT': lambda t: t ** 5,
+        'CIRC': lambda t: 1.0 - np.sqrt(np.maximum(1.0 - t * t, 0.0)),
+        'BOUNCE': lambda t: 1.0 - _bounce_out(1.0 - t),
+    }
+
+
+# Easings Blender applies for 'AUTO'; the rest ease in
+AUTO_EASE_OUT = {'BOUNCE', 'BACK', 'ELASTIC'}
+
+# Interpolations sample_preset evaluates itself. BACK, ELASTIC and EXPO
+# depend on per-keyframe settings or version-specific formulas, so presets
+# using them are sampled through an action instead.
+VECTORIZED_INTERPOLATIONS = {
+    'CONSTANT', 'LINEAR', 'BEZIER', 'SINE', 'QUAD', 'CUBIC', 'QUART', 'QUINT', 'CIRC', 'BOUNCE',
+}
+
+
+def keyframe_handles(co, handle_types):
+    """
+    Left and right handles ((n, 2) arrays) of keyframes co as Blender
+    computes them for new F-curves (no auto smoothing, constant
+    extrapolation). handle_types holds one type per keyframe, used for both
+    sides; FREE and ALIGNED handles stay on the keyframe.
+    """
+    import numpy as np
+
+    count = len(co)
+    left = co.copy()
+    right = co.copy()
+    if count < 2:
+        return left, right
+
+    # Neighbours, mirrored at the ends
+    prev = np.vstack((2 * co[0] - co[1], co[:-1]))
+    next_ = np.vstack((co[1:], 2 * co[-1] - co[-2]))
+    dvec_a = co - prev
+    dvec_b = next_ - co
+    len_a = np.where(dvec_a[:, 0] == 0, 1.0, dvec_a[:, 0])
+    len_b = np.where(dvec_b[:, 0] == 0, 1.0, dvec_b[:, 0])
+
+    types = np.asarray(handle_types)
+    vector = types == 'VECTOR'
+    left[vector] = co[vector] - dvec_a[vector] / 3.0
+    right[vector] = co[vector] + dvec_b[vector] / 3.0
+
+    tvec = dvec_b / len_b[:, None] + dvec_a / len_a[:, None]
+    length = tvec[:, 0] * 2.5614
+    auto = np.isin(types, ('AUTO', 'AUTO_CLAMPED')) & (length != 0)
+    for i in np.flatnonzero(auto):
+        la, lb = len_a[i], len_b[i]
+        la, lb = min(la, 5.0 * lb), min(lb, 5.0 * la)
+        left[i] = co[i] - tvec[i] * (la / length[i])
+        right[i] = co[i] + tvec[i] * (lb / length[i])
+
+        if 0 < i < count - 1 and types[i] == 'AUTO_CLAMPED':
+            y = co[i, 1]
+            ydiff1 = prev[i, 1] - y
+            ydiff2 = next_[i, 1] - y
+            if (ydiff1 <= 0 and ydiff2 <= 0) or (ydiff1 >= 0 and ydiff2 >= 0):
+                # Extremes stay horizontal
+                left[i, 1] = right[i, 1] = y
+                continue
+            # Handles must not pass the neighbouring keyframes
+            left_violate = (prev[i, 1] > left[i, 1]) if ydiff1 <= 0 else (prev[i, 1] < left[i, 1])
+            if left_violate:
+                left[i, 1] = prev[i, 1]
+            right_violate = (next_[i, 1] > right[i, 1]) if ydiff2 <= 0 else (next_[i, 1] < right[i, 1])
+            if right_violate:
+                right[i, 1] = next_[i, 1]
+            h1_x = left[i, 0] - co[i, 0]
+            h2_x = co[i, 0] - right[i, 0]
+            if left_violate:
+                right[i, 1] = y + ((y - left[i, 1]) / h1_x) * h2_x
+            elif right_violate:
+                left[i, 1] = y + ((y - right[i, 1]) / h2_x) * h1_x
+
+    # Auto handles of the first and last keyframe are flat
+    for i in (0, count - 1):
+        if types[i] in ('AUTO', 'AUTO_CLAMPED'):
+            left[i, 1] = right[i, 1] = co[i, 1]
+    return left, right
+
+
+def _bezier_segments(p0, p1, p2, p3, x):
+    """
+    Evaluate the Bezier segments (p0, p1, p2, p3) ((n, 2) arrays) at x
+    """
+    import numpy as np
+
+    # Handles longer than the segment are shortened, as Blender does
+    h1 = p0 - p1
+    h2 = p3 - p2
+    span = p3[:, 0] - p0[:, 0]
+    total = np.abs(h1[:, 0]) + np.abs(h2[:, 0])
+    fac = np.where(total > span, span / np.where(total == 0, 1.0, total), 1.0)[:, None]
+    p1 = p0 - fac * h1
+    p2 = p3 - fac * h2
+
+    def bezier(t, axis):
+        u = 1.0 - t
+        return (u ** 3 * p0[:, axis] + 3 * u * u * t * p1[:, axis]
+                + 3 * u * t * t * p2[:, axis] + t ** 3 * p3[:, axis])
+
+    # x(t) is monotonic once the handles are corrected, so bisect for t
+    low = np.zeros(len(x))
+    high = np.ones(len(x))
+    for _ in range(40):
+        mid = (low + high) / 2
+        below = bezier(mid, 0) < x
+        low = np.where(below, mid, low)
+        high = np.where(below, high, mid)
+    return bezier((low + high) / 2, 1)
+
+
+def sample_channel(co, settings, frames):
+    """
+    Evaluate one keyframe channel (flat (frame, value) pairs and per
+    keyframe enum settings) at frames, vectorized
+    """
+    import numpy as np
+
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 2)
+    times = np.asarray(frames, dtype=np.float64)
+    values = np.empty(len(times))
+    if len(co) == 1:
+        values[:] = co[0, 1]
+        return values
+
+    left, right = keyframe_handles(co, settings["handle_left_type"])
+    segment = np.clip(np.searchsorted(co[:, 0], times, side='right') - 1, 0, len(co) - 2)
+    start, end = co[segment], co[segment + 1]
+    t = np.clip((times - start[:, 0]) / (end[:, 0] - start[:, 0]), 0.0, 1.0)
+    begin, change = start[:, 1], end[:, 1] - start[:, 1]
+
+    interpolation = np.asarray(settings["interpolation"])[segment]
+    easing = np.asarray(settings["easing"])[segment]
+    curves = _easing_curves()
+    for kind in np.unique(interpolation):
+        mask = interpolation == kind
+        if kind == 'CONSTANT':
+            values[mask] = begin[mask]
+        elif kind == 'LINEAR':
+            values[mask] = begin[mask] + change[mask] * t[mask]
+        elif kind == 'BEZIER':
+            seg = segment[mask]
+            values[mask] = _bezier_segments(co[seg], right[seg], left[seg + 1], co[seg + 1], times[mask])
+        else:
+            for ease in np.unique(easing[mask]):
+                sub = mask & (easing == ease)
+                if ease == 'AUTO':
+                    ease = 'EASE_OUT' if kind in AUTO_EASE_OUT else 'EASE_IN'
+                shape = {'EASE_IN': _ease_in, 'EASE_OUT': _ease_out, 'EASE_IN_OUT': _ease_in_out}[ease]
+                values[sub] = shape(curves[kind])(t[sub], begin[sub], change[sub])
+
+    # Constant extrapolation outside the keyframes
+    values[times <= co[0, 0]] = co[0, 1]
+    values[times >= co[-1, 0]] = co[-1, 1]
+    return values
+
+
+def can_sample_preset(preset):
+    for channel in preset.channels:
+        settings = channel.settings
+        if not set(settings["interpolation"]) <= VECTORIZED_INTERPOLATIONS:
+            return False
+        if list(settings["handle_left_type"]) != list(settings["handle_right_type"]):
+            return False
+    return True
+
+
+def sample_preset(preset, samples_per_frame=1):
+    """
+    Like sample_action, but evaluated straight from a declarative preset's
+    keyframe arrays without building an action. Returns None if the preset
+    uses interpolations that are only sampled through an action.
+    """
+    import numpy as np
+
+    if not can_sample_preset(preset):
+        return None
+    start, end = preset.frame_range
+    # Actions are at least one frame long
+    end = max(end, start + 1.0)
+    count = int(round((end - start) * samples_per_frame)) + 1
+    frames = np.linspace(start, end, count, dtype=np.float32)
+
+    values = np.empty((len(preset.channels), count), dtype=np.float32)
+    for row, channel in enumerate(preset.channels):
+        values[row] = sample_channel(channel.co, channel.settings, frames)
+    channels = [f"{channel.data_path}[{channel.index}]" for channel in preset.channels]
+    return frames, values, channels
+
+
+def bake_action(path, action, key, fps, samples_per_frame=1):
+    frames, values, channels = sample_action(action, samples_per_frame)
+    write_bake(path, frames, values, channels, key, fps)
+    return values.shape
+
+
+def write_bake(path, frames, values, channels, key, fps):
+    """
+    Write samples as an uncompressed .npz, so each array can be memory-mapped
+    """
+    import numpy as np
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            frames=frames,
+            values=values,
+            channels=np.array(channels),
+            source_key=np.array(key),
+            fps=np.float32(fps),
+        )
+    os.replace(tmp_path, path)
+
+
+def _mmap_member(path, name):
+    # Stored (uncompressed) .npy members are contiguous in the zip, so
+    # they can be mapped directly after their headers
+    import numpy as np
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", f.read(4))
+        f.seek(name_length + extra_length, os.SEEK_CUR)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape, offset=offset,
+                     order='F' if fortran_order else 'C')
+
+
+def load_bake(path, mmap=True):
+    """
+    Return {"frames", "values", "channels", "source_key", "fps"} from a bake.
+    With mmap the sample arrays are memory-mapped instead of read.
+    """
+    import numpy as np
+
+    with np.load(path) as data:
+        bake = {
+            "channels": [str(channel) for channel in data["channels"]],
+            "source_key": str(data["source_key"]),
+            "fps": float(data["fps"]),
+        }
+        if not mmap:
+            bake["frames"] = data["frames"]
+            bake["values"] = data["values"]
+            return bake
+    for name in ("frames", "values"):
+        array = _mmap_member(path, name)
+        if array is None:
+            with np.load(path) as data:
+                array = data[name]
+        bake[name] = array
+    return bake
+
+
+def is_bake_current(path, key):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            if "source_key.npy" not in archive.namelist():
+                return False
+        return load_bake(path)["source_key"] == key
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return False
+
+
+def render_curve_preview(values, size=CURVE_PREVIEW_SIZE):
+    """
+    Plot each channel of a (channels, samples) array, normalized to its own
+    range, into packed RGBA int32 pixels (bottom row first)
+    """
+    import numpy as np
+
+    image = np.zeros((size, size, 4), dtype=np.uint8)
+    image[..., 3] = 40
+    columns = np.arange(size)
+    margin = 4
+    for row, curve in enumerate(np.asarray(values, dtype=np.float32)):
+        if not len(curve):
+            continue
+        resampled = np.interp(np.linspace(0, len(curve) - 1, size), np.arange(len(curve)), curve)
+        low, high = float(resampled.min()), float(resampled.max())
+        scale = (size - 1 - 2 * margin) / (high - low) if high > low else 0.0
+        ys = np.rint(margin + (resampled - low) * scale).astype(np.int64)
+        if not scale:
+            ys[:] = size // 2
+        color = CURVE_COLORS[row % len(CURVE_COLORS)]
+        # Two pixels thick, and joined vertically between neighbours
+        for dy in (0, 1):
+            image[np.clip(ys + dy, 0, size - 1), columns] = color
+        steps = np.minimum(ys[:-1], ys[1:]), np.maximum(ys[:-1], ys[1:])
+        for x in np.flatnonzero(steps[1] - steps[0] > 1):
+            image[steps[0][x]:steps[1][x] + 1, x] = color
+    return np.frombuffer(image.tobytes(), dtype=np.int32)
+
+
+class MotionPreviews:
+    """
+    Curve previews drawn from baked samples, so the panel can show a
+    preset's motion without building actions or evaluating the scene.
+    Rendered once per bake file and kept as preview icons.
+    """
+
+    def __init__(self):
+        # identifier -> bake file path, set by the addon
+        self.bake_resolver = None
+        self._pcoll = None
+        self._keys = {}
+
+    def icon_id(self, identifier):
+        path = self.bake_resolver(identifier) if self.bake_resolver else None
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        from bpy.utils import previews
+        if self._pcoll is None:
+            self._pcoll = previews.new()
+        key = (path, mtime)
+        preview = self._pcoll.get(identifier)
+        if self._keys.get(identifier) == key:
+            return preview.icon_id if preview is not None else None
+
+        try:
+            pixels = render_curve_preview(load_bake(path)["values"])
+        except (ImportError, OSError, ValueError, KeyError) as e:
+            print(f"Can't draw motion preview for {identifier}: {e}")
+            self._keys[identifier] = key
+            return None
+
+        if preview is None:
+            preview = self._pcoll.new(identifier)
+        preview.image_size = (CURVE_PREVIEW_SIZE, CURVE_PREVIEW_SIZE)
+        preview.image_pixels.foreach_set(pixels)
+        self._keys[identifier] = key
+        return preview.icon_id
+
+    def close(self):
+        if self._pcoll is not None:
+            from bpy.utils import previews
+            previews.remove(self._pcoll)
+            self._pcoll = None
+        self._keys = {}
+
+
+motion_previews = MotionPreviews()
@@ -0,0 +1,224 @@
+import os
+import time
+from collections import namedtuple
+from bpy.utils import previews
+
+PREVIEW_EXTENSIONS = (".gif", ".png", ".jpg")
+
+# Seconds between full per-file signature checks. The directory mtime is
+# checked on every call, but it does not change when a file is rewritten
+# in place, so modified thumbnails are picked up on this interval instead.
+SIGNATURE_CHECK_INTERVAL = 2.0
+
+# Changes between two scans: {filename: signature} for added and modified
+# files, and a list of removed filenames
+PresetDiff = namedtuple("PresetDiff", ("added", "modified", "removed"))
+
+
+def diff_signatures(old, new):
+    added = {name: sig for name, sig in new.items() if name not in old}
+    modified = {name: sig for name, sig in new.items() if name in old and old[name] != sig}
+    removed = [name for name in old if name not in new]
+    return PresetDiff(added, modified, removed)
+
+
+def scan_preview_files(presets_path):
+    """
+    Return {filename: (mtime_ns, size)} for every preview image in presets_path
+    """
+    signatures = {}
+    try:
+        with os.scandir(presets_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(PREVIEW_EXTENSIONS) and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return signatures
+
+
+class PresetCatalog:
+    """
+    Persistent cache of the preset enum items and their preview icons.
+    The presets directory is only rescanned when its mtime or the file
+    signatures change, and only added or modified thumbnails are reloaded.
+    """
+
+    def __init__(self, get_path, thumbnails=None):
+        self._get_path = get_path
+        # Optional ThumbnailCache; previews load its small icons instead of
+        # decoding the full-size source images
+        self.thumbnails = thumbnails
+        self._pcoll = None
+        self._dir_mtime = None
+        self._last_signature_check = 0.0
+        self._signatures = {}
+        self._items = []
+        self._sources = {}
+        # Enum identifiers in display order, and the position of each
+        self._order = []
+        self._positions = {}
+        # Turned off while a PresetWatcher delivers changes instead; after
+        # the first scan, apply_diff() is then the only update path
+        self.poll_signatures = True
+
+        # Counters, mostly useful for benchmarks
+        self.scan_count = 0
+        self.load_count = 0
+
+    @property
+    def pcoll(self):
+        if self._pcoll is None:
+            self._pcoll = previews.new()
+        return self._pcoll
+
+    def get_items(self):
+        if self._needs_rescan():
+            self.refresh()
+        return self._items
+
+    def invalidate(self):
+        self._dir_mtime = None
+
+    def _needs_rescan(self):
+        if not self.poll_signatures and self._dir_mtime is not None:
+            return False
+
+        presets_path = self._get_path()
+        try:
+            dir_mtime = os.stat(presets_path).st_mtime_ns
+        except OSError:
+            return bool(self._items)
+
+        if dir_mtime != self._dir_mtime:
+            return True
+
+        now = time.monotonic()
+        if self.poll_signatures and now - self._last_signature_check >= SIGNATURE_CHECK_INTERVAL:
+            self._last_signature_check = now
+            return scan_preview_files(presets_path) != self._signatures
+        return False
+
+    def refresh(self):
+        presets_path = self._get_path()
+        try:
+            self._dir_mtime = os.stat(presets_path).st_mtime_ns
+        except OSError:
+            self._dir_mtime = None
+        self._last_signature_check = time.monotonic()
+        self.scan_count += 1
+
+        return self._sync(presets_path, scan_preview_files(presets_path))
+
+    def apply_diff(self, diff):
+        """
+        Update only the entries named in a PresetDiff, without rescanning
+        """
+        if self._dir_mtime is None:
+            # Never scanned; the next get_items() does a full scan anyway
+            return False
+
+        presets_path = self._get_path()
+        signatures = dict(self._signatures)
+        signatures.update(diff.added)
+        signatures.update(diff.modified)
+        for filename in diff.removed:
+            signatures.pop(filename, None)
+
+        try:
+            self._dir_mtime = os.stat(presets_path).st_mtime_ns
+        except OSError:
+            self._dir_mtime = None
+        self._sync(presets_path, signatures)
+        return True
+
+    def _sync(self, presets_path, signatures):
+        pcoll = self.pcoll
+
+        # Release previews for files that are gone or have changed on disk
+        for filename in list(pcoll.keys()):
+            if signatures.get(filename) != self._signatures.get(filename):
+                del pcoll[filename]
+
+        enum_items = []
+        sources = {}
+        index = 1
+        for filename in sorted(signatures):
+            thumb = pcoll.get(filename)
+            if thumb is None:
+                filepath = os.path.join(presets_path, filename)
+                if self.thumbnails is not None:
+                    filepath = self.thumbnails.get(filepath)
+                try:
+                    thumb = pcoll.load(filename, filepath, 'IMAGE', force_reload=True)
+                    self.load_count += 1
+                except Exception as e:
+                    print(f"Error loading preview for {filename}: {e}")
+                    continue
+
+            name, ext = os.path.splitext(filename)
+            if name.upper() not in sources or ext.lower() == ".gif":
+                sources[name.upper()] = os.path.join(presets_path, filename)
+            enum_items.append((
+                name.upper(),
+                name.replace('_', ' ').title(),
+                f"Apply {filename} animation preset",
+                thumb.icon_id,
+                index
+            ))
+            index += 1
+
+        if self.thumbnails is not None:
+            self.thumbnails.prune({os.path.join(presets_path, filename) for filename in signatures})
+
+        self._signatures = signatures
+        self._items = enum_items
+        self._sources = sources
+        self._order = [item[0] for item in enum_items]
+        self._positions = {identifier: i for i, identifier in enumerate(self._order)}
+        return enum_items
+
+    def neighbour(self, identifier, step):
+        """
+        Return the identifier step places from identifier, clamped to the
+        ends of the list, or None if the catalog is empty
+        """
+        self.get_items()
+        if not self._order:
+            return None
+        position = self._positions.get(identifier, 0)
+        return self._order[max(0, min(len(self._order) - 1, position + step))]
+
+    def neighbours(self, identifier, radius):
+        """
+        Identifiers within radius places of identifier, nearest first
+        """
+        position = self._positions.get(identifier)
+        if position is None:
+            return []
+        result = []
+        for distance in range(1, radius + 1):
+            for i in (position + distance, position - distance):
+                if 0 <= i < len(self._order):
+                    result.append(self._order[i])
+        return result
+
+    def source_path(self, identifier):
+        """
+        Return the full-size preview image for a preset identifier, preferring
+        an animated GIF, or None
+        """
+        self.get_items()
+        return self._sources.get(identifier)
+
+    def close(self):
+        if self._pcoll is not None:
+            previews.remove(self._pcoll)
+            self._pcoll = None
+        self._signatures = {}
+        self._items = []
+        self._sources = {}
+        self._order = []
+        self._positions = {}
+        self._dir_mtime = None
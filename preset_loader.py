@@ -0,0 +1,40 @@
+import os
+import time
+import importlib.util
+
+
+class PresetModuleCache:
+    """
+    Import each preset .py file once and keep the module object, keyed by
+    path and invalidated when the file's mtime or size changes
+    """
+
+    def __init__(self):
+        self._modules = {}
+
+    def load(self, preset_path):
+        """
+        Return (module, load_seconds). load_seconds is 0.0 on a cache hit.
+        """
+        stat = os.stat(preset_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._modules.get(preset_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1], 0.0
+
+        start = time.perf_counter()
+        name = "apt_preset_" + os.path.splitext(os.path.basename(preset_path))[0]
+        spec = importlib.util.spec_from_file_location(name, preset_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        load_time = time.perf_counter() - start
+
+        self._modules[preset_path] = (signature, module)
+        return module, load_time
+
+    def discard(self, preset_path):
+        self._modules.pop(preset_path, None)
+
+    def clear(self):
+        self._modules.clear()
@@ -0,0 +1,68 @@
+import queue
+import threading
+import bpy
+from .preset_catalog import scan_preview_files, diff_signatures
+
+# Seconds between directory scans on the watcher thread
+POLL_INTERVAL = 0.5
+
+# Seconds between checks for pending diffs on the main thread
+APPLY_INTERVAL = 0.25
+
+
+class PresetWatcher:
+    """
+    Stat the presets directory from a background thread and hand the
+    added/modified/removed previews to the main thread, where a
+    bpy.app.timers callback passes each diff to on_diff(diff).
+    """
+
+    def __init__(self, get_path, on_diff):
+        self._get_path = get_path
+        self._on_diff = on_diff
+        self._diffs = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._timer = self._apply_pending
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PresetWatcher", daemon=True)
+        self._thread.start()
+        if not bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.register(self._timer, first_interval=APPLY_INTERVAL, persistent=True)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=POLL_INTERVAL * 4)
+            self._thread = None
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+
+    def _run(self):
+        # Only touches the file system; never bpy
+        signatures = scan_preview_files(self._get_path())
+        while not self._stop.wait(POLL_INTERVAL):
+            current = scan_preview_files(self._get_path())
+            if current != signatures:
+                self._diffs.put(diff_signatures(signatures, current))
+                signatures = current
+
+    def _apply_pending(self):
+        while True:
+            try:
+                diff = self._diffs.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._on_diff(diff)
+            except Exception as e:
+                print(f"Error applying preset changes: {e}")
+        return APPLY_INTERVAL
@@ -1,98 +1,497 @@
 import bpy
 import os
-import tempfile
-from PIL import Image
 import io
+import struct
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    from .instrumentation import timed
+except ImportError:
+    # Imported as a top-level module by batch_previews.py
+    from instrumentation import timed
+
+
+def _linear_to_srgb(pixels):
+    pixels = np.clip(pixels, 0.0, 1.0)
+    return np.where(pixels <= 0.0031308, pixels * 12.92, 1.055 * np.power(pixels, 1 / 2.4) - 0.055)
+
+
+# Palette index kept free in adaptive GIFs for pixels unchanged since the
+# previous frame
+TRANSPARENT_INDEX = 255
+
+# Pixels sampled from each frame to build an adaptive GIF's shared palette
+PALETTE_SAMPLE_PIXELS = 4096
+
+# Frames held back to build the shared palette before streaming starts
+PALETTE_FRAMES = 8
+
+# Mean error per channel (0-255) above which a frame gets its own palette
+PALETTE_MAX_ERROR = 24.0
+
+
+def to_display_rgb(pixels, width, height):
+    """
+    Convert a bottom-up RGBA pixel buffer (float scene-linear, or uint8
+    already in display space) into a top-down (height, width, 3) uint8 sRGB
+    array. Float pixels get the Standard view transform only.
+    """
+    if pixels.dtype != np.uint8:
+        pixels = (_linear_to_srgb(pixels) * 255.0 + 0.5).astype(np.uint8)
+    return np.ascontiguousarray(pixels.reshape(height, width, 4)[::-1, :, :3])
+
+
+def quantize_frame(pixels, width, height, colors=256):
+    """
+    Convert a bottom-up RGBA pixel buffer (float linear or uint8 display)
+    into a palette image ready for GIF encoding
+    """
+    from PIL import Image
+
+    return Image.fromarray(to_display_rgb(pixels, width, height)).quantize(colors)
+
+
+def encode_gif_frame(image, duration, offset=(0, 0), disposal=1):
+    """
+    LZW-encode a palette image as one GIF frame (graphic control extension,
+    image descriptor with local color table, image data)
+    """
+    from PIL import GifImagePlugin
+
+    params = {"duration": duration, "disposal": disposal, "include_color_table": True}
+    return b"".join(GifImagePlugin.getdata(image, offset, **params))
+
+
+def _quantize_and_encode(pixels, width, height, duration):
+    # Runs on the worker pool
+    return encode_gif_frame(quantize_frame(pixels, width, height), duration)
+
+
+def build_palette(frames, colors=TRANSPARENT_INDEX):
+    """
+    Quantize a sample of pixels from every frame into one palette image
+    """
+    from PIL import Image
+
+    step = max(1, frames[0].shape[0] * frames[0].shape[1] // PALETTE_SAMPLE_PIXELS)
+    sample = np.concatenate([frame.reshape(-1, 3)[::step] for frame in frames])
+    return Image.fromarray(sample.reshape(-1, 1, 3)).quantize(colors)
+
+
+def map_to_palette(rgb, palette):
+    """
+    Return the palette indices of an RGB frame as a (height, width) uint8 array
+    """
+    from PIL import Image
+
+    # No dithering: it would make static areas differ between frames
+    return np.asarray(Image.fromarray(rgb).quantize(palette=palette, dither=0))
+
+
+def changed_rect(previous, current):
+    """
+    Bounding box (x, y, width, height) of the pixels that differ between two
+    index or RGB frames, or None
+    """
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
+
+
+def encode_indexed_frame(indices, duration, offset=(0, 0), transparency=None):
+    """
+    LZW-encode palette indices as one GIF frame that uses the global color
+    table and is drawn over the previous frame
+    """
+    from PIL import GifImagePlugin, Image
+
+    height, width = indices.shape
+    image = Image.frombytes('P', (width, height), np.ascontiguousarray(indices).tobytes())
+    params = {"duration": duration, "disposal": 1, "include_color_table": False}
+    if transparency is not None:
+        params["transparency"] = transparency
+    return b"".join(GifImagePlugin.getdata(image, offset, **params))
+
+
+def encode_adaptive_frame(rgb, duration, previous, palette, palette_rgb):
+    """
+    Encode the rectangle of rgb that changed since previous (the whole frame
+    if None) against the shared palette, leaving unchanged pixels
+    transparent. A frame with colors the palette can't represent is encoded
+    whole with its own color table instead.
+    """
+    from PIL import Image
+
+    x, y, width, height = (0, 0, rgb.shape[1], rgb.shape[0]) if previous is None else changed_rect(previous, rgb)
+    crop = rgb[y:y + height, x:x + width]
+    indices = map_to_palette(crop, palette)
+    if np.abs(palette_rgb[indices].astype(np.int16) - crop).mean() > PALETTE_MAX_ERROR:
+        return encode_gif_frame(Image.fromarray(rgb).quantize(), duration)
+    if previous is None:
+        return encode_indexed_frame(indices, duration)
+
+    indices = indices.copy()
+    indices[(previous[y:y + height, x:x + width] == crop).all(axis=2)] = TRANSPARENT_INDEX
+    return encode_indexed_frame(indices, duration, (x, y), TRANSPARENT_INDEX)
+
+
+class AdaptiveGIFEncoder:
+    """
+    Stream display frames into a compact GIF: consecutive duplicate frames
+    are dropped (their durations merged), frames share one global palette
+    built from the first PALETTE_FRAMES frames, and each frame only stores
+    the rectangle that changed, with unchanged pixels inside it left
+    transparent. At most PALETTE_FRAMES frames plus max_in_flight encoding
+    jobs are held at any time.
+    """
+
+    def __init__(self, fp, width, height, submit=None, max_in_flight=8):
+        self.fp = fp
+        self.width = width
+        self.height = height
+        # Runs encoding jobs, e.g. a pool's submit; inline if None
+        self.submit = submit
+        self.max_in_flight = max_in_flight
+        self.dropped = 0
+        self._writer = None
+        self._palette = None
+        self._palette_rgb = None
+        self._warmup = []
+        # [rgb, duration, previous rgb] of the newest frame, not yet
+        # submitted so repeats can still extend its duration
+        self._held = None
+        self._pending = collections.deque()
+
+    def add(self, rgb, duration):
+        if self._writer is not None:
+            self._add(rgb, duration)
+            return
+        self._warmup.append((rgb, duration))
+        if len(self._warmup) >= PALETTE_FRAMES:
+            self._start()
+
+    def _start(self):
+        palette_bytes = None
+        if self._warmup:
+            self._palette = build_palette([rgb for rgb, _ in self._warmup])
+            palette_bytes = bytes(self._palette.getpalette()[:768]).ljust(768, b"\0")
+            self._palette_rgb = np.frombuffer(palette_bytes, dtype=np.uint8).reshape(256, 3)
+        self._writer = GIFStreamWriter(self.fp, self.width, self.height, palette=palette_bytes)
+        warmup, self._warmup = self._warmup, []
+        for rgb, duration in warmup:
+            self._add(rgb, duration)
+
+    def _add(self, rgb, duration):
+        previous = None
+        if self._held is not None:
+            if np.array_equal(self._held[0], rgb):
+                self._held[1] += duration
+                self.dropped += 1
+                return
+            previous = self._held[0]
+            self._encode(*self._held)
+        self._held = [rgb, duration, previous]
+
+    def _encode(self, rgb, duration, previous):
+        args = (rgb, duration, previous, self._palette, self._palette_rgb)
+        if self.submit is None:
+            self._writer.write_frame(encode_adaptive_frame(*args))
+            return
+        self._pending.append(self.submit(encode_adaptive_frame, *args))
+        # Write finished frames in order; block only at the in-flight limit
+        while self._pending and (self._pending[0].done() or len(self._pending) > self.max_in_flight):
+            self._writer.write_frame(self._pending.popleft().result())
+
+    def close(self):
+        """
+        Write the remaining frames and the trailer. Returns the frames written.
+        """
+        if self._writer is None:
+            self._start()
+        if self._held is not None:
+            self._encode(*self._held)
+            self._held = None
+        while self._pending:
+            self._writer.write_frame(self._pending.popleft().result())
+        self._writer.close()
+        return self._writer.frame_count
+
+
+class GIFStreamWriter:
+    """
+    Write an animated GIF one encoded frame at a time, so frames never need
+    to be held in memory together
+    """
+
+    def __init__(self, fp, width, height, loop=0, palette=None):
+        self.fp = fp
+        self.frame_count = 0
+
+        if palette is None:
+            # Header and logical screen descriptor without a global color
+            # table; every frame carries its own palette
+            fp.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0))
+        else:
+            # 256-entry global color table shared by all frames
+            fp.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0) + palette)
+        # NETSCAPE2.0 looping extension
+        fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    def write_frame(self, data):
+        self.fp.write(data)
+        self.frame_count += 1
+
+    def close(self):
+        self.fp.write(b";")
+
+
+class _StandardView:
+    """
+    Switch the scene to the plain sRGB Standard view transform (no look,
+    exposure, gamma or curves) and restore its colour management on exit.
+    Previews compare presets, so they shouldn't change with each scene's
+    grading, and the Viewer node's scene-linear pixels then only need the
+    sRGB transfer function applied by to_display_rgb.
+    """
+
+    SETTINGS = (
+        ("display_settings", "display_device", 'sRGB'),
+        ("view_settings", "view_transform", 'Standard'),
+        ("view_settings", "look", 'None'),
+        ("view_settings", "exposure", 0.0),
+        ("view_settings", "gamma", 1.0),
+        ("view_settings", "use_curve_mapping", False),
+    )
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def __enter__(self):
+        self._saved = []
+        for group, attr, value in self.SETTINGS:
+            settings = getattr(self.scene, group)
+            self._saved.append((settings, attr, getattr(settings, attr)))
+            setattr(settings, attr, value)
+        return self
+
+    def __exit__(self, *exc):
+        # Same order as set: looks are only valid for their view transform
+        for settings, attr, value in self._saved:
+            setattr(settings, attr, value)
+
+
+class _RenderFrameSource:
+    """
+    Render each frame and read the pixels back from the compositor's Viewer
+    node image, without writing the frame to disk
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def __enter__(self):
+        scene = self.scene
+        self._use_nodes = scene.use_nodes
+        self._use_compositing = scene.render.use_compositing
+        scene.use_nodes = True
+        scene.render.use_compositing = True
+
+        tree = scene.node_tree
+        self._layers = tree.nodes.new('CompositorNodeRLayers')
+        self._viewer = tree.nodes.new('CompositorNodeViewer')
+        tree.links.new(self._layers.outputs['Image'], self._viewer.inputs['Image'])
+        return self
+
+    def grab(self):
+        bpy.ops.render.render()
+        image = bpy.data.images['Viewer Node']
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return pixels
+
+    def __exit__(self, *exc):
+        tree = self.scene.node_tree
+        tree.nodes.remove(self._viewer)
+        tree.nodes.remove(self._layers)
+        self.scene.use_nodes = self._use_nodes
+        self.scene.render.use_compositing = self._use_compositing
+
+
+class _OffscreenFrameSource:
+    """
+    Draw each frame from the scene camera into a GPU offscreen buffer using
+    an open 3D viewport
+    """
+
+    def __init__(self, scene, width, height, area):
+        self.scene = scene
+        self.width = width
+        self.height = height
+        self.space = area.spaces.active
+        self.region = next(region for region in area.regions if region.type == 'WINDOW')
+
+    def __enter__(self):
+        import gpu
+        self._gpu = gpu
+        self._offscreen = gpu.types.GPUOffScreen(self.width, self.height)
+        return self
+
+    def grab(self):
+        scene = self.scene
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        camera = scene.camera
+        view_matrix = camera.matrix_world.inverted()
+        projection_matrix = camera.calc_matrix_camera(depsgraph, x=self.width, y=self.height)
+
+        self._offscreen.draw_view3d(
+            scene, bpy.context.view_layer, self.space, self.region,
+            view_matrix, projection_matrix, do_color_management=True,
+        )
+        with self._offscreen.bind():
+            framebuffer = self._gpu.state.active_framebuffer_get()
+            buffer = framebuffer.read_color(0, 0, self.width, self.height, 4, 0, 'UBYTE')
+        return np.asarray(buffer, dtype=np.uint8).reshape(-1)
+
+    def __exit__(self, *exc):
+        self._offscreen.free()
+
+
+def _find_view3d_area():
+    if bpy.app.background or bpy.context.screen is None:
+        return None
+    for area in bpy.context.screen.areas:
+        if area.type == 'VIEW_3D':
+            return area
+    return None
+
 
 class AnimationPresetGIFPreview:
-    def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
-        
-    def create_preview(self, start_frame, end_frame, width=200, height=200):
+    def __init__(self, workers=None, max_frames_in_flight=None):
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        # Bounds memory: frames rendered but not yet written to the GIF
+        self.max_frames_in_flight = max_frames_in_flight or self.workers * 2
+
+    def _frame_source(self, scene, width, height, use_offscreen):
+        area = _find_view3d_area() if use_offscreen else None
+        if area is not None and scene.camera is not None:
+            return _OffscreenFrameSource(scene, width, height, area)
+        return _RenderFrameSource(scene)
+
+    def write_preview(self, fp, start_frame, end_frame, width=200, height=200, fps=24, use_offscreen=False,
+                      adaptive=True):
         """
-        Create a GIF preview of the animation between start_frame and end_frame
-        Returns the binary data of the optimized GIF
+        Render frames start_frame..end_frame and stream them into fp as a
+        GIF. Pixel conversion and encoding run on a worker pool while the
+        next frame renders, with at most max_frames_in_flight frames held in
+        memory. With adaptive encoding duplicate frames are dropped and only
+        changed rectangles are stored against one shared palette; otherwise
+        every frame has its own palette. Frames are rendered with the
+        Standard view transform, see _StandardView.
         """
-        original_frame = bpy.context.scene.frame_current
-        frames = []
-        
+        scene = bpy.context.scene
+        original_frame = scene.frame_current
+
         # Store render settings
-        original_resolution_x = bpy.context.scene.render.resolution_x
-        original_resolution_y = bpy.context.scene.render.resolution_y
-        original_percentage = bpy.context.scene.render.resolution_percentage
-        
+        original_resolution_x = scene.render.resolution_x
+        original_resolution_y = scene.render.resolution_y
+        original_percentage = scene.render.resolution_percentage
+
         try:
             # Set temporary render settings for preview
-            bpy.context.scene.render.resolution_x = width
-            bpy.context.scene.render.resolution_y = height
-            bpy.context.scene.render.resolution_percentage = 100
-            
-            # Render frames
-            for frame in range(start_frame, end_frame + 1):
-                bpy.context.scene.frame_set(frame)
-                
-                # Render frame to temporary file
-                temp_path = os.path.join(self.temp_dir, f"preview_frame_{frame}.png")
-                bpy.context.scene.render.filepath = temp_path
-                bpy.ops.render.render(write_still=True)
-                
-                # Open rendered frame with PIL
-                img = Image.open(temp_path)
-                frames.append(img.copy())
-                
-                # Clean up temporary file
-                os.remove(temp_path)
-                
-            # Create optimized GIF
-            output_buffer = io.BytesIO()
-            
-            # Save with optimization
-            frames[0].save(
-                output_buffer,
-                format='GIF',
-                save_all=True,
-                append_images=frames[1:],
-                duration=1000/24,  # 24 fps
-                loop=0,
-                optimize=True,
-                quality=70,  # Lower quality for smaller file size
-                disposal=2,  # Clear frame before rendering next
-            )
-            
-            return output_buffer.getvalue()
-            
+            scene.render.resolution_x = width
+            scene.render.resolution_y = height
+            scene.render.resolution_percentage = 100
+
+            duration = round(1000 / fps)
+            pending = collections.deque()
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                if adaptive:
+                    encoder = AdaptiveGIFEncoder(fp, width, height, pool.submit, self.max_frames_in_flight)
+                    convert, consume = to_display_rgb, lambda rgb: encoder.add(rgb, duration)
+                else:
+                    writer = GIFStreamWriter(fp, width, height)
+                    convert, consume = _quantize_and_encode, writer.write_frame
+
+                with _StandardView(scene), self._frame_source(scene, width, height, use_offscreen) as source:
+                    for frame in range(start_frame, end_frame + 1):
+                        scene.frame_set(frame)
+                        pixels = source.grab()
+                        args = (pixels, width, height) if adaptive else (pixels, width, height, duration)
+                        pending.append(pool.submit(convert, *args))
+
+                        # Consume finished frames in order; block only when
+                        # the in-flight limit is reached
+                        while pending and (pending[0].done() or len(pending) > self.max_frames_in_flight):
+                            consume(pending.popleft().result())
+
+                    while pending:
+                        consume(pending.popleft().result())
+
+                if adaptive:
+                    return encoder.close()
+
+            writer.close()
+            return writer.frame_count
+
         finally:
             # Restore original render settings
-            bpy.context.scene.render.resolution_x = original_resolution_x
-            bpy.context.scene.render.resolution_y = original_resolution_y
-            bpy.context.scene.render.resolution_percentage = original_percentage
-            bpy.context.scene.frame_set(original_frame)
+            scene.render.resolution_x = original_resolution_x
+            scene.render.resolution_y = original_resolution_y
+            scene.render.resolution_percentage = original_percentage
+            scene.frame_set(original_frame)
+
+    @timed("create_preview")
+    def create_preview(self, start_frame, end_frame, width=200, height=200, fps=24, use_offscreen=False,
+                       adaptive=True):
+        """
+        Create a GIF preview of the animation between start_frame and end_frame
+        Returns the binary data of the GIF
+        """
+        output_buffer = io.BytesIO()
+        self.write_preview(output_buffer, start_frame, end_frame, width, height, fps, use_offscreen, adaptive)
+        return output_buffer.getvalue()
 
-    def save_preview(self, filepath, start_frame, end_frame, width=200, height=200):
+    @timed("save_preview")
+    def save_preview(self, filepath, start_frame, end_frame, width=200, height=200, fps=24, use_offscreen=False,
+                     adaptive=True):
         """
         Create and save a GIF preview to the specified filepath
         """
-        gif_data = self.create_preview(start_frame, end_frame, width, height)
         with open(filepath, 'wb') as f:
-            f.write(gif_data)
+            self.write_preview(f, start_frame, end_frame, width, height, fps, use_offscreen, adaptive)
 
 # Example usage in your addon:
 class ANIMATION_OT_create_preset_preview(bpy.types.Operator):
     bl_idname = "animation.create_preset_preview"
     bl_label = "Create Preset Preview"
-    
+
+    use_offscreen: bpy.props.BoolProperty(
+        name="Viewport Preview",
+        description="Draw frames with the viewport renderer instead of a full render",
+        default=False
+    )
+
     def execute(self, context):
         preview_generator = AnimationPresetGIFPreview()
-        
+
         # Get animation range
         scene = context.scene
         start = scene.frame_start
         end = scene.frame_end
-        
+
         # Create preview
         preview_path = os.path.join(bpy.app.tempdir, "preset_preview.gif")
-        preview_generator.save_preview(preview_path, start, end)
-        
+        preview_generator.save_preview(preview_path, start, end, use_offscreen=self.use_offscreen)
+
         return {'FINISHED'}
 
 def register():
@@ -102,4 +501,4 @@ def unregister():
     bpy.utils.unregister_class(ANIMATION_OT_create_preset_preview)
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
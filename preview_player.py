@@ -0,0 +1,317 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import bpy
+from bpy.utils import previews
+
+PLAYER_SIZE = 128
+
+# GIFs commonly store 0 or tiny delays that browsers clamp; do the same
+MIN_FRAME_DURATION = 0.02
+DEFAULT_FRAME_DURATION = 0.1
+
+# Decoded previews kept ready by the prefetcher
+PREFETCH_CACHE_SIZE = 6
+
+# Default memory budget of the decoded preview icons kept by the player
+PREVIEW_MEMORY_BUDGET_MB = 64
+
+
+def redraw_sidebar():
+    # Only the 3D viewport sidebars show the panel; leave everything else alone
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                for region in area.regions:
+                    if region.type == 'UI':
+                        region.tag_redraw()
+
+
+def decode_gif_frames(filepath, size=PLAYER_SIZE):
+    """
+    Decode every frame of filepath into (packed RGBA int32 pixels, duration)
+    pairs at size x size, bottom row first as Blender previews expect
+    """
+    import numpy as np
+    from PIL import Image, ImageSequence
+    from .thumbnail_cache import fit_square
+
+    frames = []
+    with Image.open(filepath) as image:
+        for frame in ImageSequence.Iterator(image):
+            rgba = np.asarray(fit_square(frame, size), dtype=np.uint8)[::-1]
+            pixels = np.frombuffer(np.ascontiguousarray(rgba).tobytes(), dtype=np.int32)
+            duration = frame.info.get("duration", 0) / 1000.0
+            frames.append((pixels, duration if duration >= MIN_FRAME_DURATION else DEFAULT_FRAME_DURATION))
+    return frames
+
+
+class FramePrefetcher:
+    """
+    Decode GIF frames on a background thread ahead of use. Decoding only
+    uses PIL and NumPy; turning frames into preview icons stays on the
+    main thread. Keeps the most recently requested results.
+    """
+
+    def __init__(self, max_entries=PREFETCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def request(self, key, filepath):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PreviewPrefetch")
+        self._executor.submit(self._decode, key, filepath)
+
+    def _decode(self, key, filepath):
+        try:
+            frames = decode_gif_frames(filepath)
+        except Exception:
+            # load() decodes again on the main thread and reports the error
+            frames = None
+        with self._lock:
+            self._pending.discard(key)
+            if frames:
+                self._cache[key] = frames
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+    def take(self, key):
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._cache.clear()
+            self._pending.clear()
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(pixels.nbytes for frames in self._cache.values() for pixels, _ in frames)
+
+
+class PreviewLRU:
+    """
+    Least recently used cache bounded by the approximate size of its
+    values rather than their number. on_evict(key, value) is called for
+    every entry that is dropped, so it can free what the value holds. The
+    most recently used entry is always kept, even on its own over budget.
+    """
+
+    def __init__(self, budget, on_evict=None):
+        self.budget = budget
+        self.on_evict = on_evict
+        self.usage = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def peek(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        self.discard(key)
+        self._entries[key] = (value, nbytes)
+        self.usage += nbytes
+        self._evict()
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.usage -= entry[1]
+            if self.on_evict is not None:
+                self.on_evict(key, entry[0])
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+    def _evict(self):
+        while self.usage > self.budget and len(self._entries) > 1:
+            self.discard(next(iter(self._entries)))
+
+    def clear(self):
+        while self._entries:
+            self.discard(next(iter(self._entries)))
+
+
+class DecodedPreview:
+    __slots__ = ("key", "pcoll", "icon_ids", "durations")
+
+    def __init__(self, key, pcoll, icon_ids, durations):
+        self.key = key
+        self.pcoll = pcoll
+        self.icon_ids = icon_ids
+        self.durations = durations
+
+
+class PreviewPlayer:
+    """
+    Plays a preset's GIF preview inside the panel. Frames are decoded once
+    into preview icons; a bpy.app.timers ticker advances current_frame at the
+    GIF's own frame rate and redraws only the sidebar, without touching the
+    scene timeline or the depsgraph.
+
+    Decoded previews stay in a memory-bounded LRU, so going back to a
+    recently shown preset is instant; evicted ones are decoded again when
+    they are shown next.
+    """
+
+    def __init__(self):
+        # identifier -> source image path, set by the addon
+        self.source_resolver = None
+        self.cache = PreviewLRU(PREVIEW_MEMORY_BUDGET_MB * 1024 * 1024, self._evicted)
+        self._current = None
+        self._scene_name = None
+        self.prefetcher = FramePrefetcher()
+        # Timers are registered by identity, so keep one bound method around
+        self._timer = self._tick
+
+    @property
+    def frame_count(self):
+        return len(self._current.icon_ids) if self._current is not None else 0
+
+    def _evicted(self, identifier, decoded):
+        previews.remove(decoded.pcoll)
+        if decoded is self._current:
+            self._current = None
+
+    def _source_key(self, identifier):
+        source = self.source_resolver(identifier) if self.source_resolver else None
+        if source is None:
+            return None
+        try:
+            return (identifier, source, os.stat(source).st_mtime_ns)
+        except OSError:
+            return None
+
+    def prefetch(self, identifiers):
+        """
+        Start decoding the previews of identifiers in the background
+        """
+        for identifier in identifiers:
+            key = self._source_key(identifier)
+            if key is None or not key[1].lower().endswith(".gif"):
+                continue
+            decoded = self.cache.peek(identifier)
+            if decoded is None or decoded.key != key:
+                self.prefetcher.request(key, key[1])
+
+    def load(self, identifier):
+        """
+        Make sure the frames for identifier are decoded. Returns False if the
+        preset has no preview that can be played.
+        """
+        key = self._source_key(identifier)
+        if key is None:
+            return False
+        decoded = self.cache.get(identifier)
+        if decoded is not None and decoded.key == key:
+            self._current = decoded
+            return True
+
+        frames = self.prefetcher.take(key)
+        if frames is None:
+            try:
+                frames = decode_gif_frames(key[1])
+            except (ImportError, OSError) as e:
+                print(f"Can't play preview for {identifier}: {e}")
+                return False
+        if not frames:
+            return False
+
+        pcoll = previews.new()
+        decoded = DecodedPreview(key, pcoll, [], [])
+        for i, (pixels, duration) in enumerate(frames):
+            preview = pcoll.new(f"{identifier}:{i}")
+            preview.image_size = (PLAYER_SIZE, PLAYER_SIZE)
+            preview.image_pixels.foreach_set(pixels)
+            decoded.icon_ids.append(preview.icon_id)
+            decoded.durations.append(duration)
+        # Roughly what Blender holds for the icons: RGBA bytes per frame
+        self.cache.put(identifier, decoded, len(frames) * PLAYER_SIZE * PLAYER_SIZE * 4)
+        self._current = decoded
+        return True
+
+    def icon_id(self, identifier, frame):
+        decoded = self._current
+        if decoded is None or decoded.key[0] != identifier or not decoded.icon_ids:
+            return None
+        self.cache.get(identifier)
+        return decoded.icon_ids[min(frame, len(decoded.icon_ids) - 1)]
+
+    def memory_usage(self):
+        """
+        Return (bytes held by preview icons, bytes of prefetched frames,
+        number of decoded previews)
+        """
+        return self.cache.usage, self.prefetcher.nbytes, len(self.cache)
+
+    def start(self, scene):
+        self._scene_name = scene.name
+        if not bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.register(self._timer, first_interval=self._current.durations[0])
+
+    def stop(self):
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+
+    def _tick(self):
+        scene = bpy.data.scenes.get(self._scene_name)
+        if scene is None:
+            return None
+        props = scene.animation_preset_props
+
+        if not props.is_playing:
+            return None
+        decoded = self._current
+        if decoded is None or props.preset_enum != decoded.key[0]:
+            # Selected preset changed under us
+            props["is_playing"] = False
+            redraw_sidebar()
+            return None
+
+        frame = (props.current_frame + 1) % len(decoded.icon_ids)
+        # Item assignment skips the RNA update, so no depsgraph tag or
+        # window-wide notifier is sent for every frame
+        props["current_frame"] = frame
+        redraw_sidebar()
+        return decoded.durations[frame]
+
+    def release(self):
+        self.cache.clear()
+        self._current = None
+
+    def close(self):
+        self.stop()
+        self.release()
+        self.prefetcher.close()
+
+
+preview_player = PreviewPlayer()
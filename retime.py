@@ -0,0 +1,131 @@
+import uuid
+import bpy
+from bpy.app.handlers import persistent
+
+# ID properties on the action holding the un-scaled keyframe times, so
+# repeated retiming never compounds and survives save/reload
+ORIGINAL_TIMES_KEY = "apt_original_times"
+ORIGINAL_COUNTS_KEY = "apt_original_counts"
+SPEED_KEY = "apt_retime_speed"
+# Random token identifying the stored originals, so the cache below never
+# mixes up actions that reuse an address or name after load or undo
+ORIGINALS_TOKEN_KEY = "apt_original_token"
+
+# Keyframe attributes whose x component is scaled
+TIME_ATTRS = ("co", "handle_left", "handle_right")
+
+# Parsed originals per token, so slider drags don't re-read ID properties
+_originals_cache = {}
+
+
+def _keyframe_counts(fcurves):
+    import numpy as np
+    return np.array([len(fc.keyframe_points) for fc in fcurves], dtype=np.int64)
+
+
+def _read_points(fcurves, counts, attr):
+    import numpy as np
+
+    buf = np.empty(int(counts.sum()) * 2, dtype=np.float32)
+    offset = 0
+    for fc, count in zip(fcurves, counts):
+        end = offset + count * 2
+        fc.keyframe_points.foreach_get(attr, buf[offset:end])
+        offset = end
+    return buf
+
+
+def _write_points(fcurves, counts, attr, buf):
+    offset = 0
+    for fc, count in zip(fcurves, counts):
+        end = offset + count * 2
+        fc.keyframe_points.foreach_set(attr, buf[offset:end])
+        offset = end
+
+
+def _capture_originals(action, fcurves, counts):
+    # Keyframes were added or removed since the last capture (or there was
+    # none); undo the last applied speed to recover the un-scaled times
+    import numpy as np
+
+    speed = action.get(SPEED_KEY, 1.0) or 1.0
+    times = np.stack([_read_points(fcurves, counts, attr)[0::2] for attr in TIME_ATTRS])
+    times /= speed
+
+    action[ORIGINAL_TIMES_KEY] = times.ravel().tolist()
+    action[ORIGINAL_COUNTS_KEY] = counts.tolist()
+    return times
+
+
+def get_original_times(action, fcurves=None):
+    """
+    Return the original keyframe times of action as a (3, n) float32 array:
+    co.x, handle_left.x and handle_right.x for every keyframe in fcurve order
+    """
+    import numpy as np
+
+    if fcurves is None:
+        fcurves = list(action.fcurves)
+    counts = _keyframe_counts(fcurves)
+
+    token = action.get(ORIGINALS_TOKEN_KEY)
+    cached = _originals_cache.get(token) if token else None
+    if cached is not None and np.array_equal(cached[0], counts):
+        return cached[1]
+
+    stored_counts = action.get(ORIGINAL_COUNTS_KEY)
+    if stored_counts is not None and np.array_equal(np.asarray(stored_counts.to_list()), counts):
+        times = np.array(action[ORIGINAL_TIMES_KEY].to_list(), dtype=np.float32).reshape(3, -1)
+    else:
+        times = _capture_originals(action, fcurves, counts)
+
+    if not token:
+        token = action[ORIGINALS_TOKEN_KEY] = uuid.uuid4().hex
+    _originals_cache[token] = (counts, times)
+    return times
+
+
+def retime_action(action, speed):
+    """
+    Scale all keyframe times of action to original * speed in one NumPy pass.
+    Returns the scaled (start, end) frame range, or None for an empty action.
+    """
+    fcurves = list(action.fcurves)
+    originals = get_original_times(action, fcurves)
+    if not originals.size:
+        return None
+
+    counts = _keyframe_counts(fcurves)
+    scaled = originals * speed
+    for row, attr in enumerate(TIME_ATTRS):
+        buf = _read_points(fcurves, counts, attr)
+        buf[0::2] = scaled[row]
+        _write_points(fcurves, counts, attr, buf)
+
+    for fc in fcurves:
+        fc.update()
+
+    action[SPEED_KEY] = speed
+    return float(scaled[0].min()), float(scaled[0].max())
+
+
+def clear_cache():
+    _originals_cache.clear()
+
+
+@persistent
+def _on_reset(*args):
+    # Loading a file or undoing replaces every action's ID properties
+    clear_cache()
+
+
+def register():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(_on_reset)
+
+
+def unregister():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _on_reset in handlers:
+            handlers.remove(_on_reset)
+    clear_cache()
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+
+THUMBNAIL_SIZE = 128
+INDEX_NAME = "index.json"
+
+
+def _file_hash(filepath):
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fit_square(image, size):
+    from PIL import Image
+
+    image = image.convert('RGBA')
+    image.thumbnail((size, size), Image.LANCZOS)
+    square = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    square.paste(image, ((size - image.width) // 2, (size - image.height) // 2))
+    return square
+
+
+class ThumbnailCache:
+    """
+    Small fixed-size PNG icons generated from preset previews the first
+    time they are seen. Files are keyed by the source's content hash, so
+    the panel never decodes full-size GIFs.
+    """
+
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.size = size
+        self._index = None
+        self._index_dirty = False
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.cache_dir, INDEX_NAME)) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def save_index(self):
+        if not self._index_dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = os.path.join(self.cache_dir, INDEX_NAME + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, os.path.join(self.cache_dir, INDEX_NAME))
+        self._index_dirty = False
+
+    def source_hash(self, source_path):
+        # Hashing an 800 KB GIF on every startup would defeat the cache, so
+        # remember the hash per (mtime, size) signature
+        stat = os.stat(source_path)
+        index = self._load_index()
+        entry = index.get(source_path)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+
+        digest = _file_hash(source_path)
+        index[source_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        self._index_dirty = True
+        return digest
+
+    def _cached_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}_{self.size}.png")
+
+    def get(self, source_path):
+        """
+        Return the path of the icon for source_path, generating it if needed.
+        Falls back to source_path when the icon can't be generated (for
+        example when PIL is not available).
+        """
+        try:
+            thumb_path = self._cached_path(self.source_hash(source_path))
+            if not os.path.exists(thumb_path):
+                self._generate(source_path, thumb_path)
+            return thumb_path
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Thumbnail cache: using {os.path.basename(source_path)} directly ({e})")
+            return source_path
+
+    def _write(self, image, path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        image.save(tmp_path, format='PNG', optimize=True)
+        os.replace(tmp_path, path)
+
+    def _generate(self, source_path, thumb_path):
+        from PIL import Image
+
+        with Image.open(source_path) as image:
+            # First frame only for animated GIFs
+            image.seek(0)
+            self._write(fit_square(image, self.size), thumb_path)
+
+    def prune(self, source_paths):
+        """
+        Delete cached files that don't belong to any of source_paths
+        """
+        index = self._load_index()
+        keep = set()
+        for path in source_paths:
+            entry = index.get(path)
+            if entry is not None:
+                keep.add(entry[2])
+
+        for path in list(index):
+            if path not in source_paths:
+                del index[path]
+                self._index_dirty = True
+
+        try:
+            filenames = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for filename in filenames:
+            if filename.endswith(".png") and filename.split("_", 1)[0] not in keep:
+                os.remove(os.path.join(self.cache_dir, filename))
+        self.save_index()